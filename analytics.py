@@ -2,23 +2,135 @@
 
 from __future__ import annotations
 
-import math
+import copy
+from dataclasses import dataclass, fields
 from pathlib import Path
+from types import MappingProxyType
 
+import numpy as np
 import yaml
 
-
-def load_config() -> dict:
-    base = Path(__file__).parent
-    config_path = base / "config.yaml"
+try:
+    from numba import njit
+except ImportError:  # numba は任意（未インストール時は純 Python で計算）
+    njit = None
+
+_BASE_DIR = Path(__file__).parent
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# SS判定の対象となる「低位 / 貸借」の値
+_LOW_OR_TAISHAKU = frozenset(("低位", "貸借"))
+
+# 出口戦略カラム → 表示ラベル
+STOP_REASON_MAP = {
+    "stop_osaedama": "抑え玉喰わない",
+    "stop_itakyushu": "買い板吸収しない",
+    "stop_itakieru": "買い板消える",
+    "stop_fushi_noforce": "節目ブレイク後勢いなし",
+    "stop_hamekomi": "買い板はめこみ",
+    "stop_sashene_care": "指値ケア反応悪く下振り懸念",
+    "stop_ita_yowaku": "買い板弱くなる",
+    "stop_ue_kawanai": "上を買わなくなる",
+    "stop_yakan_pts": "夜間PTS",
+    "stop_mochikoshi": "持ち越し翌日売り",
+    "stop_renkaiato": "連買後",
+}
+
+
+def index_map(values: tuple[str, ...] | list[str]) -> dict[str, int]:
+    """値 → values 内で最初に現れた位置（selectbox の index やカテゴリ別集計に使う）"""
+    idx = {}
+    for i, v in enumerate(values):
+        idx.setdefault(v, i)
+    return idx
+
+
+@dataclass(frozen=True)
+class ConfigView:
+    """config から統計計算用の値を取り出したもの（config 更新時に再構築）"""
+
+    r_unit: int
+    default_stop_loss: float
+    ss_cap: float
+    s_cap: float
+    ss_max: int
+    s_max: int
+    a_max: int
+    entry_types: tuple[str, ...]
+    entry_type_idx: dict[str, int]
+    qualities: tuple[str, ...]
+    quality_idx: dict[str, int]
+    reason_map: MappingProxyType
+    reason_cols: tuple[str, ...]
+
+    @classmethod
+    def from_config(cls, config: dict) -> ConfigView:
+        entry_types = tuple(config.get("entry_types", []))
+        qualities = tuple(config.get("meigara_quality_options", []))
+        rules = config.get("grade_rules", {})
+        return cls(
+            r_unit=config.get("risk", {}).get("r_unit", 10000),
+            default_stop_loss=config.get("risk", {}).get("default_stop_loss", 0.05),
+            ss_cap=rules.get("SS", {}).get("market_cap_max", 6_000_000_000),
+            s_cap=rules.get("S", {}).get("market_cap_max", 6_000_000_000),
+            ss_max=rules.get("SS", {}).get("max_r", 10),
+            s_max=rules.get("S", {}).get("max_r", 5),
+            a_max=rules.get("A", {}).get("max_r", 1),
+            entry_types=entry_types,
+            entry_type_idx=index_map(entry_types),
+            qualities=qualities,
+            quality_idx=index_map(qualities),
+            reason_map=MappingProxyType(STOP_REASON_MAP),
+            reason_cols=tuple(STOP_REASON_MAP),
+        )
+
+
+# (path, mtime_ns) -> (解析済み config, ConfigView)。ファイル更新時のみ再パースする
+_config_cache: tuple[tuple[str, int], dict, ConfigView] | None = None
+_EMPTY_VIEW = ConfigView.from_config({})
+
+
+def _config_path() -> Path | None:
+    config_path = _BASE_DIR / "config.yaml"
     if config_path.exists():
-        with open(config_path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
-    default_path = base / "config.default.yaml"
+        return config_path
+    default_path = _BASE_DIR / "config.default.yaml"
     if default_path.exists():
-        with open(default_path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
-    return {}
+        return default_path
+    return None
+
+
+def _load_cached() -> tuple[dict, ConfigView]:
+    global _config_cache
+    path = _config_path()
+    if path is None:
+        return {}, _EMPTY_VIEW
+    key = (str(path), path.stat().st_mtime_ns)
+    if _config_cache is not None and _config_cache[0] == key:
+        return _config_cache[1], _config_cache[2]
+    with open(path, "r", encoding="utf-8") as f:
+        config = yaml.load(f, Loader=_YAML_LOADER) or {}
+    view = ConfigView.from_config(config)
+    _config_cache = (key, config, view)
+    return config, view
+
+
+def get_config() -> dict:
+    """キャッシュ済みの config を返す（読み取り専用として扱うこと）。
+
+    config.yaml / config.default.yaml の mtime が変わった時だけ再パースする。
+    """
+    return _load_cached()[0]
+
+
+def get_config_view() -> ConfigView:
+    """キャッシュ済みの ConfigView を返す（get_config と同時に更新される）"""
+    return _load_cached()[1]
+
+
+def load_config() -> dict:
+    """config を返す（呼び出し側で書き換えても良いようにコピーを返す）"""
+    return copy.deepcopy(get_config())
 
 
 # ---------- 級判定 ----------
@@ -33,27 +145,19 @@ def judge_grade(
     Returns:
         (grade, max_r)  例: ("SS", 10)
     """
-    config = load_config()
-    rules = config.get("grade_rules", {})
-    r_unit = config.get("risk", {}).get("r_unit", 10000)
+    cfg = get_config_view()
 
     # SS判定: 時価総額60億以下 & 日足位置良い & 低位or貸借
-    ss_rule = rules.get("SS", {})
-    if (market_cap is not None
-            and market_cap <= ss_rule.get("market_cap_max", 6_000_000_000)
-            and hiduke_position_good
-            and teii_or_taishaku in ("低位", "貸借")):
-        return "SS", ss_rule.get("max_r", 10)
+    if (market_cap is not None and market_cap <= cfg.ss_cap
+            and hiduke_position_good and teii_or_taishaku in _LOW_OR_TAISHAKU):
+        return "SS", cfg.ss_max
 
     # S判定: 時価総額60億以下
-    s_rule = rules.get("S", {})
-    if (market_cap is not None
-            and market_cap <= s_rule.get("market_cap_max", 6_000_000_000)):
-        return "S", s_rule.get("max_r", 5)
+    if market_cap is not None and market_cap <= cfg.s_cap:
+        return "S", cfg.s_max
 
     # A判定: それ以外すべて
-    a_rule = rules.get("A", {})
-    return "A", a_rule.get("max_r", 1)
+    return "A", cfg.a_max
 
 
 # ---------- ロット計算（Rベース） ----------
@@ -82,9 +186,8 @@ def calc_lot_r(
             "r_unit": int,
         }
     """
-    config = load_config()
     if r_unit is None:
-        r_unit = config.get("risk", {}).get("r_unit", 10000)
+        r_unit = get_config_view().r_unit
 
     risk_amount = max_r * r_unit
     loss_per_share = abs(entry_price - stop_loss_price)
@@ -100,7 +203,7 @@ def calc_lot_r(
         }
 
     raw_shares = risk_amount / loss_per_share
-    lot = int(math.floor(raw_shares / 100)) * 100  # 100株単位
+    lot = (int(raw_shares) // 100) * 100  # 100株単位
     position_size = lot * entry_price
 
     return {
@@ -120,11 +223,8 @@ def calc_lot_from_percent(
     r_unit: int = None,
 ) -> dict:
     """損切り幅を%で指定してロットを計算する"""
-    config = load_config()
-    risk_cfg = config.get("risk", {})
-
     if stop_loss_percent is None:
-        stop_loss_percent = risk_cfg.get("default_stop_loss", 0.05)
+        stop_loss_percent = get_config_view().default_stop_loss
 
     stop_loss_price = entry_price * (1 - stop_loss_percent)
     return calc_lot_r(entry_price, stop_loss_price, max_r, r_unit)
@@ -132,6 +232,11 @@ def calc_lot_from_percent(
 
 # ---------- 期待値計算 ----------
 
+def _round_ev_pf(expected_value: float, profit_factor: float) -> tuple[float, float]:
+    """期待値・PF をスカラーで丸める（calc_expected_value とカテゴリ別集計で共通）"""
+    return round(expected_value, 2), round(profit_factor, 2)
+
+
 def calc_expected_value(
     win_rate: float,
     avg_win: float,
@@ -158,148 +263,301 @@ def calc_expected_value(
 
     breakeven = avg_loss / (avg_win + avg_loss) if (avg_win + avg_loss) > 0 else 0
 
+    expected_value, profit_factor = _round_ev_pf(expected_value, profit_factor)
     return {
-        "expected_value": round(expected_value, 2),
-        "profit_factor": round(profit_factor, 2),
+        "expected_value": expected_value,
+        "profit_factor": profit_factor,
         "breakeven_winrate": round(breakeven, 4),
     }
 
 
+# ---------- 統計結果 ----------
+
+class _StatsRecord:
+    """統計結果の共通処理（dict 化）"""
+
+    __slots__ = ()
+
+    def to_dict(self) -> dict:
+        """フィールド順を保った dict を返す（値はコピーしない）"""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+@dataclass(slots=True, frozen=True)
+class TradeStats(_StatsRecord):
+    """calc_trade_statistics の結果"""
+
+    total: int
+    wins: int
+    losses: int
+    win_rate: float
+    loss_rate: float
+    total_pnl: float
+    total_pnl_r: float
+    avg_win_r: float
+    avg_loss_r: float
+    max_win_r: float
+    max_loss_r: float
+    expected_value_r: float
+    profit_factor: float
+    breakeven_winrate: float
+    accuracy: str
+    next_max_r: int
+    next_lot_info: dict
+    consecutive_wins: int
+    consecutive_losses: int
+    r_unit: int
+    win_trades: list | None = None  # include_win_trades=True の場合のみ
+
+    def to_dict(self) -> dict:
+        d = _StatsRecord.to_dict(self)
+        if self.win_trades is None:
+            del d["win_trades"]
+        return d
+
+
+@dataclass(slots=True, frozen=True)
+class EntryTypeStat(_StatsRecord):
+    """エントリー分類別の勝率・期待値"""
+
+    entry_type: str
+    total: int
+    wins: int
+    losses: int
+    win_rate: float
+    total_pnl: float
+    avg_pnl: float
+    avg_win: float
+    avg_loss: float
+    expected_value: float
+    profit_factor: float
+
+
+@dataclass(slots=True, frozen=True)
+class QualityStat(_StatsRecord):
+    """銘柄質別の勝率・期待値"""
+
+    quality: str
+    total: int
+    wins: int
+    losses: int
+    win_rate: float
+    total_pnl: float
+    avg_pnl: float
+    avg_win: float
+    avg_loss: float
+    expected_value: float
+    profit_factor: float
+
+
+@dataclass(slots=True, frozen=True)
+class StopReasonStat(_StatsRecord):
+    """出口戦略ごとの発生回数"""
+
+    reason: str
+    count: int
+    ratio: float
+
+
+@dataclass(slots=True, frozen=True)
+class TradeColumns:
+    """トレード（dict のリスト）を列ごとの NumPy 配列にしたもの。
+
+    同じトレード一覧で複数の統計を出す場合は TradeColumns.from_trades() で
+    一度だけ変換し、各 calc_* 関数に渡す。
+    """
+
+    trades: list[dict]
+    is_win: np.ndarray          # result == "win"
+    pnl: np.ndarray
+    entry_type: np.ndarray
+    meigara_quality: np.ndarray
+    date: np.ndarray
+    stop_reasons: np.ndarray    # (トレード数 × 出口戦略数) の真偽値行列
+
+    @classmethod
+    def from_trades(cls, trades: list[dict]) -> TradeColumns:
+        rows = [
+            (
+                t.get("result") == "win",
+                t.get("pnl", 0) or 0,
+                t.get("entry_type") or "",
+                t.get("meigara_quality") or "",
+                t.get("date", ""),
+            )
+            for t in trades
+        ]
+        is_win, pnl, entry_type, quality, dates = zip(*rows) if rows else ((),) * 5
+        reason_cols = tuple(STOP_REASON_MAP)
+        stop_reasons = np.fromiter(
+            (bool(t.get(col)) for t in trades for col in reason_cols),
+            dtype=np.bool_,
+            count=len(trades) * len(reason_cols),
+        ).reshape(-1, len(reason_cols))
+        return cls(
+            trades=trades,
+            is_win=np.array(is_win, dtype=np.bool_),
+            pnl=np.asarray(pnl, dtype=np.float64),
+            entry_type=np.array(entry_type, dtype=object),
+            meigara_quality=np.array(quality, dtype=object),
+            date=np.array(dates, dtype=object),
+            stop_reasons=stop_reasons,
+        )
+
+    def __len__(self) -> int:
+        return len(self.trades)
+
+
+def _as_columns(trades: list[dict] | TradeColumns) -> TradeColumns:
+    if isinstance(trades, TradeColumns):
+        return trades
+    return TradeColumns.from_trades(trades)
+
+
 # ---------- 統計機能（Rベース） ----------
 
-def calc_trade_statistics(trades: list[dict]) -> dict:
+def calc_trade_statistics(
+    trades: list[dict] | TradeColumns,
+    include_win_trades: bool = False,
+) -> TradeStats:
     """全トレードからRベースの統計情報を算出する。
 
     期待値 = (勝率 × 平均利益R) − (負率 × 平均損失R)
 
+    Args:
+        trades: トレード記録のリスト（または TradeColumns）
+        include_win_trades: True の場合のみ勝ちトレード一覧 win_trades を含める
+
     Returns:
-        {
-            "total": int,
-            "wins": int, "losses": int,
-            "win_rate": float, "loss_rate": float,
-            "total_pnl": float,
-            "total_pnl_r": float,
-            "avg_win_r": float, "avg_loss_r": float,
-            "max_win_r": float, "max_loss_r": float,
-            "expected_value_r": float,
-            "profit_factor": float,
-            "breakeven_winrate": float,
-            "accuracy": str,
-            "next_max_r": int,
-            "next_lot_info": dict,
-            "win_trades": list,
-            "consecutive_wins": int,
-            "consecutive_losses": int,
-        }
+        TradeStats（dict が必要な場合は .to_dict()）
     """
-    config = load_config()
-    r_unit = config.get("risk", {}).get("r_unit", 10000)
+    cfg = get_config_view()
+    r_unit = cfg.r_unit
 
-    if not trades:
-        return _empty_stats()
+    cols = _as_columns(trades)
+    if not len(cols):
+        return _empty_stats(include_win_trades)
 
-    win_trades = [t for t in trades if t.get("result") == "win"]
-    loss_trades = [t for t in trades if t.get("result") != "win"]
+    pnl = cols.pnl
+    is_win = cols.is_win
+
+    # R換算
+    pnl_r = np.abs(pnl) / r_unit
+    win_pnls_r = pnl_r[is_win]
+    loss_pnls_r = pnl_r[~is_win]
 
-    total = len(trades)
-    wins = len(win_trades)
-    losses = len(loss_trades)
+    total = len(cols)
+    wins = int(is_win.sum())
+    losses = total - wins
     win_rate = wins / total
     loss_rate = 1 - win_rate
 
-    # R換算
-    win_pnls_r = [abs(t.get("pnl", 0) or 0) / r_unit for t in win_trades]
-    loss_pnls_r = [abs(t.get("pnl", 0) or 0) / r_unit for t in loss_trades]
+    sum_win_r = float(win_pnls_r.sum())
+    sum_loss_r = float(loss_pnls_r.sum())
+    avg_win_r = sum_win_r / wins if wins else 0
+    avg_loss_r = sum_loss_r / losses if losses else 0
+    max_win_r = float(win_pnls_r.max(initial=0))
+    max_loss_r = float(loss_pnls_r.max(initial=0))
+    total_pnl = float(pnl.sum())
 
-    avg_win_r = sum(win_pnls_r) / len(win_pnls_r) if win_pnls_r else 0
-    avg_loss_r = sum(loss_pnls_r) / len(loss_pnls_r) if loss_pnls_r else 0
-    max_win_r = max(win_pnls_r) if win_pnls_r else 0
-    max_loss_r = max(loss_pnls_r) if loss_pnls_r else 0
+    # 連勝・連敗（日付順）
+    order = np.argsort(cols.date, kind="stable")
+    consec_w, consec_l = _calc_streaks(is_win[order])
 
     # 期待値（Rベース）
     expected_value_r = (win_rate * avg_win_r) - (loss_rate * avg_loss_r)
 
     # PF
-    total_win_r = sum(win_pnls_r)
-    total_loss_r = sum(loss_pnls_r)
-    profit_factor = total_win_r / total_loss_r if total_loss_r > 0 else float("inf")
+    profit_factor = sum_win_r / sum_loss_r if sum_loss_r > 0 else float("inf")
 
     # 損益分岐勝率
     breakeven = avg_loss_r / (avg_win_r + avg_loss_r) if (avg_win_r + avg_loss_r) > 0 else 0
 
-    # 連勝・連敗
-    consec_w, consec_l = _calc_consecutive(trades)
-
     # 精度（サンプル数による信頼度）
     accuracy = _calc_accuracy(total)
 
     # 次回許容ロット算出
-    next_max_r, next_lot_info = _calc_next_lot(expected_value_r, win_rate, total, config)
-
-    total_pnl = sum(t.get("pnl", 0) or 0 for t in trades)
-
-    return {
-        "total": total,
-        "wins": wins,
-        "losses": losses,
-        "win_rate": round(win_rate, 4),
-        "loss_rate": round(loss_rate, 4),
-        "total_pnl": round(total_pnl, 0),
-        "total_pnl_r": round(total_pnl / r_unit, 2),
-        "avg_win_r": round(avg_win_r, 2),
-        "avg_loss_r": round(avg_loss_r, 2),
-        "max_win_r": round(max_win_r, 2),
-        "max_loss_r": round(max_loss_r, 2),
-        "expected_value_r": round(expected_value_r, 2),
-        "profit_factor": round(profit_factor, 2),
-        "breakeven_winrate": round(breakeven, 4),
-        "accuracy": accuracy,
-        "next_max_r": next_max_r,
-        "next_lot_info": next_lot_info,
-        "win_trades": win_trades,
-        "consecutive_wins": consec_w,
-        "consecutive_losses": consec_l,
-        "r_unit": r_unit,
-    }
-
-
-def _empty_stats() -> dict:
-    return {
-        "total": 0, "wins": 0, "losses": 0,
-        "win_rate": 0, "loss_rate": 0,
-        "total_pnl": 0, "total_pnl_r": 0,
-        "avg_win_r": 0, "avg_loss_r": 0,
-        "max_win_r": 0, "max_loss_r": 0,
-        "expected_value_r": 0, "profit_factor": 0,
-        "breakeven_winrate": 0,
-        "accuracy": "データなし",
-        "next_max_r": 1, "next_lot_info": {},
-        "win_trades": [],
-        "consecutive_wins": 0, "consecutive_losses": 0,
-        "r_unit": 10000,
-    }
-
-
-def _calc_consecutive(trades: list[dict]) -> tuple[int, int]:
-    """現在の連勝数・最大連敗数を算出"""
+    next_max_r, next_lot_info = _calc_next_lot(expected_value_r, win_rate, total, cfg)
+
+    win_trades = None
+    if include_win_trades:
+        win_trades = [cols.trades[i] for i in np.flatnonzero(is_win).tolist()]
+
+    return TradeStats(
+        total=total,
+        wins=wins,
+        losses=losses,
+        win_rate=round(win_rate, 4),
+        loss_rate=round(loss_rate, 4),
+        total_pnl=round(total_pnl, 0),
+        total_pnl_r=round(total_pnl / r_unit, 2),
+        avg_win_r=round(avg_win_r, 2),
+        avg_loss_r=round(avg_loss_r, 2),
+        max_win_r=round(max_win_r, 2),
+        max_loss_r=round(max_loss_r, 2),
+        expected_value_r=round(expected_value_r, 2),
+        profit_factor=round(profit_factor, 2),
+        breakeven_winrate=round(breakeven, 4),
+        accuracy=accuracy,
+        next_max_r=next_max_r,
+        next_lot_info=next_lot_info,
+        consecutive_wins=consec_w,
+        consecutive_losses=consec_l,
+        r_unit=r_unit,
+        win_trades=win_trades,
+    )
+
+
+def _empty_stats(include_win_trades: bool = False) -> TradeStats:
+    return TradeStats(
+        total=0, wins=0, losses=0,
+        win_rate=0, loss_rate=0,
+        total_pnl=0, total_pnl_r=0,
+        avg_win_r=0, avg_loss_r=0,
+        max_win_r=0, max_loss_r=0,
+        expected_value_r=0, profit_factor=0,
+        breakeven_winrate=0,
+        accuracy="データなし",
+        next_max_r=1, next_lot_info={},
+        consecutive_wins=0, consecutive_losses=0,
+        r_unit=10000,
+        win_trades=[] if include_win_trades else None,
+    )
+
+
+def _streaks(results) -> tuple[int, int]:
+    """勝敗（1=勝ち, 0=負け）の並びから最大連勝数・最大連敗数を算出"""
     max_consec_w = 0
     max_consec_l = 0
     current_w = 0
     current_l = 0
-
-    for t in sorted(trades, key=lambda x: x.get("date", "")):
-        if t.get("result") == "win":
+    for i in range(len(results)):
+        if results[i]:
             current_w += 1
             current_l = 0
-            max_consec_w = max(max_consec_w, current_w)
+            if current_w > max_consec_w:
+                max_consec_w = current_w
         else:
             current_l += 1
             current_w = 0
-            max_consec_l = max(max_consec_l, current_l)
-
+            if current_l > max_consec_l:
+                max_consec_l = current_l
     return max_consec_w, max_consec_l
 
 
+if njit is not None:
+    _streaks = njit(cache=True)(_streaks)
+
+
+def _calc_streaks(is_win: np.ndarray) -> tuple[int, int]:
+    """日付順の勝敗配列から最大連勝数・最大連敗数を算出"""
+    if njit is None:
+        # numba 未インストール時は Python のリストで回す（ndarray の要素アクセスより速い）
+        return _streaks(is_win.tolist())
+    consec_w, consec_l = _streaks(is_win.astype(np.int8))
+    return int(consec_w), int(consec_l)
+
+
 def _calc_accuracy(total: int) -> str:
     """サンプル数から統計の信頼度を判定"""
     if total >= 100:
@@ -314,7 +572,7 @@ def _calc_accuracy(total: int) -> str:
         return "データ不足（5トレード未満）"
 
 
-def _calc_next_lot(ev_r: float, win_rate: float, total: int, config: dict) -> tuple[int, dict]:
+def _calc_next_lot(ev_r: float, win_rate: float, total: int, cfg: ConfigView) -> tuple[int, dict]:
     """期待値と勝率から次回許容R数を算出する。
 
     ルール:
@@ -322,12 +580,7 @@ def _calc_next_lot(ev_r: float, win_rate: float, total: int, config: dict) -> tu
       - EV > 0 だがデータ不足 → 最大Rの半分
       - EV <= 0 → 1R固定（最小リスク）
     """
-    r_unit = config.get("risk", {}).get("r_unit", 10000)
-    rules = config.get("grade_rules", {})
-
-    ss_max = rules.get("SS", {}).get("max_r", 10)
-    s_max = rules.get("S", {}).get("max_r", 5)
-    a_max = rules.get("A", {}).get("max_r", 1)
+    ss_max, s_max, a_max = cfg.ss_max, cfg.s_max, cfg.a_max
 
     if ev_r <= 0:
         # 期待値マイナス → 1R固定
@@ -365,181 +618,107 @@ def _calc_next_lot(ev_r: float, win_rate: float, total: int, config: dict) -> tu
 
 # ---------- エントリー分類別 勝率自動算出 ----------
 
-def calc_entry_type_stats(trades: list[dict]) -> list[dict]:
+def calc_entry_type_stats(trades: list[dict] | TradeColumns) -> list[EntryTypeStat]:
     """エントリー分類ごとの勝率・期待値を算出する。
 
     Returns:
-        [
-            {
-                "entry_type": str,
-                "total": int,
-                "wins": int,
-                "losses": int,
-                "win_rate": float,
-                "total_pnl": float,
-                "avg_pnl": float,
-                "avg_win": float,
-                "avg_loss": float,
-                "expected_value": float,
-                "profit_factor": float,
-            },
-            ...
-        ]
+        config の entry_types 順の EntryTypeStat のリスト
     """
-    config = load_config()
-    entry_types = config.get("entry_types", [])
-
-    # 分類ごとに集計
-    stats_map = {}
-    for et in entry_types:
-        stats_map[et] = {"wins": [], "losses": []}
-
-    for t in trades:
-        et = t.get("entry_type", "")
-        if et not in stats_map:
-            stats_map[et] = {"wins": [], "losses": []}
-        pnl = t.get("pnl", 0) or 0
-        if t.get("result") == "win":
-            stats_map[et]["wins"].append(pnl)
-        else:
-            stats_map[et]["losses"].append(abs(pnl))
-
-    results = []
-    for et in entry_types:
-        data = stats_map.get(et, {"wins": [], "losses": []})
-        wins = data["wins"]
-        losses = data["losses"]
-        total = len(wins) + len(losses)
-
-        if total == 0:
-            results.append({
-                "entry_type": et,
-                "total": 0, "wins": 0, "losses": 0,
-                "win_rate": 0, "total_pnl": 0, "avg_pnl": 0,
-                "avg_win": 0, "avg_loss": 0,
-                "expected_value": 0, "profit_factor": 0,
-            })
-            continue
-
-        win_rate = len(wins) / total
-        avg_win = sum(wins) / len(wins) if wins else 0
-        avg_loss = sum(losses) / len(losses) if losses else 0
-        total_pnl = sum(wins) - sum(losses)
-        avg_pnl = total_pnl / total
-
-        ev = calc_expected_value(win_rate, avg_win, avg_loss)
-
-        results.append({
-            "entry_type": et,
-            "total": total,
-            "wins": len(wins),
-            "losses": len(losses),
-            "win_rate": round(win_rate, 4),
-            "total_pnl": round(total_pnl, 0),
-            "avg_pnl": round(avg_pnl, 0),
-            "avg_win": round(avg_win, 0),
-            "avg_loss": round(avg_loss, 0),
-            "expected_value": ev["expected_value"],
-            "profit_factor": ev["profit_factor"],
-        })
-
-    return results
-
-
-def calc_stop_reason_stats(trades: list[dict]) -> list[dict]:
-    """出口戦略ごとの発生回数を集計する。"""
-    reason_map = {
-        "stop_osaedama": "抑え玉喰わない",
-        "stop_itakyushu": "買い板吸収しない",
-        "stop_itakieru": "買い板消える",
-        "stop_fushi_noforce": "節目ブレイク後勢いなし",
-        "stop_hamekomi": "買い板はめこみ",
-        "stop_sashene_care": "指値ケア反応悪く下振り懸念",
-        "stop_ita_yowaku": "買い板弱くなる",
-        "stop_ue_kawanai": "上を買わなくなる",
-        "stop_yakan_pts": "夜間PTS",
-        "stop_mochikoshi": "持ち越し翌日売り",
-        "stop_renkaiato": "連買後",
+    cfg = get_config_view()
+    return _category_stats(trades, "entry_type", cfg.entry_types, cfg.entry_type_idx, EntryTypeStat)
+
+
+def _groupby_stats(
+    pnl: np.ndarray,
+    is_win: np.ndarray,
+    keys: np.ndarray,
+    categories: tuple[str, ...],
+    cat_to_idx: dict[str, int],
+) -> dict[str, np.ndarray]:
+    """カテゴリごとの勝ち／負け件数と損益合計を np.bincount で一括集計する。
+
+    cat_to_idx はカテゴリ → categories 内の位置（ConfigView で事前計算済み）。
+    戻り値の各配列は categories と同じ並び（カテゴリ外のキーは無視）。
+    """
+    k = len(categories)
+
+    idx = np.fromiter((cat_to_idx.get(key, -1) for key in keys.tolist()), dtype=np.int64, count=len(keys))
+    valid = idx >= 0
+    idx, pnl, is_win = idx[valid], pnl[valid], is_win[valid]
+    win_idx = idx[is_win]
+    loss_idx = idx[~is_win]
+
+    pos = [cat_to_idx[c] for c in categories]
+    return {
+        "wins": np.bincount(win_idx, minlength=k)[pos],
+        "losses": np.bincount(loss_idx, minlength=k)[pos],
+        "win_sum": np.bincount(win_idx, weights=pnl[is_win], minlength=k)[pos],
+        "loss_sum": np.bincount(loss_idx, weights=np.abs(pnl[~is_win]), minlength=k)[pos],
     }
 
-    counts = {label: 0 for label in reason_map.values()}
-    loss_trades = [t for t in trades if t.get("result") != "win"]
-    total_losses = len(loss_trades)
 
-    for t in loss_trades:
-        for col, label in reason_map.items():
-            if t.get(col):
-                counts[label] += 1
+def _category_stats(
+    trades: list[dict] | TradeColumns,
+    key_field: str,
+    categories: tuple[str, ...],
+    cat_to_idx: dict[str, int],
+    record: type[EntryTypeStat] | type[QualityStat],
+) -> list:
+    """カテゴリ別（エントリー分類・銘柄質）の勝率・期待値を算出する"""
+    cols = _as_columns(trades)
+    grouped = _groupby_stats(cols.pnl, cols.is_win, getattr(cols, key_field), categories, cat_to_idx)
+
+    # 期待値・PF をカテゴリ数 K の配列演算でまとめて算出
+    wins = grouped["wins"]
+    losses = grouped["losses"]
+    total = wins + losses
+    has_trades = total > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.where(has_trades, wins / total, 0.0)
+        avg_win = np.where(wins > 0, grouped["win_sum"] / wins, 0.0)
+        avg_loss = np.where(losses > 0, grouped["loss_sum"] / losses, 0.0)
+        total_pnl = grouped["win_sum"] - grouped["loss_sum"]
+        avg_pnl = np.where(has_trades, total_pnl / total, 0.0)
+        ev = win_rate * avg_win - (1 - win_rate) * avg_loss
+        loss_total = (1 - win_rate) * avg_loss
+        pf = np.where(loss_total > 0, (win_rate * avg_win) / loss_total, np.inf)
+    pf = np.where(has_trades, pf, 0.0)
+
+    # 丸めは np.round ではなく組み込み round() でスカラーごとに行う（半端値の結果を揃える）
+    return [
+        record(
+            c, n, w, l, round(wr, 4), round(tp, 0), round(ap, 0), round(aw, 0), round(al, 0),
+            *_round_ev_pf(e, f),
+        )
+        for c, n, w, l, wr, tp, ap, aw, al, e, f in zip(
+            categories, total.tolist(), wins.tolist(), losses.tolist(),
+            win_rate.tolist(), total_pnl.tolist(), avg_pnl.tolist(), avg_win.tolist(), avg_loss.tolist(),
+            ev.tolist(), pf.tolist(),
+        )
+    ]
+
+
+def calc_stop_reason_stats(trades: list[dict] | TradeColumns) -> list[StopReasonStat]:
+    """出口戦略ごとの発生回数を集計する。"""
+    cfg = get_config_view()
+    labels = cfg.reason_map.values()
+    cols = _as_columns(trades)
 
-    results = []
-    for label, count in counts.items():
-        results.append({
-            "reason": label,
-            "count": count,
-            "ratio": round(count / total_losses, 4) if total_losses > 0 else 0,
-        })
+    # 負けトレードの行だけ取り出して列方向に合計
+    is_loss = ~cols.is_win
+    total_losses = int(is_loss.sum())
+    counts = cols.stop_reasons[is_loss].sum(axis=0).tolist()
 
-    return results
+    # 比率も np.round ではなく組み込み round() でスカラーごとに丸める
+    return [
+        StopReasonStat(label, count, round(count / total_losses, 4) if total_losses > 0 else 0)
+        for label, count in zip(labels, counts)
+    ]
 
 
 # ---------- 銘柄質別 勝率自動算出 ----------
 
-def calc_quality_stats(trades: list[dict]) -> list[dict]:
+def calc_quality_stats(trades: list[dict] | TradeColumns) -> list[QualityStat]:
     """銘柄質ごとの勝率・期待値を算出する。"""
-    config = load_config()
-    qualities = config.get("meigara_quality_options", [])
-
-    stats_map = {}
-    for q in qualities:
-        stats_map[q] = {"wins": [], "losses": []}
-
-    for t in trades:
-        q = t.get("meigara_quality", "")
-        if q not in stats_map:
-            stats_map[q] = {"wins": [], "losses": []}
-        pnl = t.get("pnl", 0) or 0
-        if t.get("result") == "win":
-            stats_map[q]["wins"].append(pnl)
-        else:
-            stats_map[q]["losses"].append(abs(pnl))
-
-    results = []
-    for q in qualities:
-        data = stats_map.get(q, {"wins": [], "losses": []})
-        wins = data["wins"]
-        losses = data["losses"]
-        total = len(wins) + len(losses)
-
-        if total == 0:
-            results.append({
-                "quality": q,
-                "total": 0, "wins": 0, "losses": 0,
-                "win_rate": 0, "total_pnl": 0, "avg_pnl": 0,
-                "avg_win": 0, "avg_loss": 0,
-                "expected_value": 0, "profit_factor": 0,
-            })
-            continue
-
-        win_rate = len(wins) / total
-        avg_win = sum(wins) / len(wins) if wins else 0
-        avg_loss = sum(losses) / len(losses) if losses else 0
-        total_pnl = sum(wins) - sum(losses)
-        avg_pnl = total_pnl / total
-
-        ev = calc_expected_value(win_rate, avg_win, avg_loss)
-
-        results.append({
-            "quality": q,
-            "total": total,
-            "wins": len(wins),
-            "losses": len(losses),
-            "win_rate": round(win_rate, 4),
-            "total_pnl": round(total_pnl, 0),
-            "avg_pnl": round(avg_pnl, 0),
-            "avg_win": round(avg_win, 0),
-            "avg_loss": round(avg_loss, 0),
-            "expected_value": ev["expected_value"],
-            "profit_factor": ev["profit_factor"],
-        })
-
-    return results
+    cfg = get_config_view()
+    return _category_stats(trades, "meigara_quality", cfg.qualities, cfg.quality_idx, QualityStat)
@@ -5,7 +5,6 @@ import streamlit as st
 st.set_page_config(page_title="FUDO", page_icon="📊", layout="wide")
 
 try:
-    import pandas as pd
     from datetime import date, datetime, timedelta, timezone
 
     JST = timezone(timedelta(hours=9))
@@ -17,7 +16,7 @@ try:
     from analytics import (
         judge_grade, calc_lot_r, calc_expected_value,
         calc_entry_type_stats, calc_stop_reason_stats, calc_quality_stats,
-        calc_trade_statistics, load_config,
+        calc_trade_statistics, get_config, index_map, TradeColumns, TradeStats,
     )
     pass
 except Exception as e:
@@ -26,7 +25,172 @@ except Exception as e:
     st.code(traceback.format_exc())
     st.stop()
 
-config = load_config()
+# 読み取り専用で使うため、mtime 単位でキャッシュ済みの config をそのまま参照する
+config = get_config()
+
+
+# ===== DB読み込みキャッシュ（再実行ごとの SQLite 読み込みを省く。書き込み時に .clear()） =====
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_get_stocks(target_date: str | None = None) -> list[dict]:
+    return db.get_stocks(target_date)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_get_stocks_by_ticker(ticker: str) -> list[dict]:
+    return db.get_stocks_by_ticker(ticker)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_get_latest_stock(ticker: str) -> dict | None:
+    return db.get_latest_stock_by_ticker(ticker)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_get_trades(target_date: str | None = None) -> list[dict]:
+    return db.get_trades(target_date)
+
+
+# scheduler など別プロセスからも書き込まれるため TTL は短め
+@st.cache_data(ttl=10, show_spinner=False)
+def _cached_get_disclosures(
+    source: str | None = None,
+    target_date: str | None = None,
+    max_market_cap: float | None = None,
+) -> list[dict]:
+    return db.get_disclosures(source=source, target_date=target_date, max_market_cap=max_market_cap)
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _cached_disclosures_by_id(
+    source: str | None = None,
+    target_date: str | None = None,
+    max_market_cap: float | None = None,
+) -> dict[int, dict]:
+    return {d["id"]: d for d in _cached_get_disclosures(source, target_date, max_market_cap)}
+
+
+# ===== 表示列（DB列名 → 表示名） =====
+# ウォッチリスト
+DISPLAY_COLS = {
+    "id": "ID", "date": "日付", "name": "銘柄名", "ticker": "コード",
+    "market_cap": "時価総額", "margin_buy_ratio": "信用買残%",
+    "fushi": "節目", "pts_volume": "PTS出来高",
+    "prev_day_sell_volume": "前日売り総量",
+    "daily_disclosure_count": "日々公表",
+    "hiduke_position_good": "日足位置", "teii_or_taishaku": "低位/貸借",
+    "meigara_quality": "銘柄質", "grade": "級",
+    "max_r": "最大R", "lot_strategy": "ロット戦略",
+}
+# トレード履歴
+SHOW_COLS = {
+    "id": "ID", "date": "日付", "name": "銘柄名", "ticker": "コード",
+    "grade": "級", "entry_type": "分類", "entry_position": "位置",
+    "meigara_quality": "銘柄質",
+    "entry_price": "IN", "exit_price": "OUT",
+    "lot": "ロット", "pnl": "損益", "result": "結果",
+    "stop_osaedama": "抑え玉", "stop_itakyushu": "板吸収",
+    "stop_itakieru": "板消え", "stop_fushi_noforce": "勢いなし",
+    "stop_hamekomi": "はめこみ", "stop_sashene_care": "指値ケア",
+    "stop_ita_yowaku": "板弱化",
+    "stop_ue_kawanai": "上買わず", "stop_yakan_pts": "夜間PTS",
+    "stop_mochikoshi": "持越翌日売", "stop_renkaiato": "連買後",
+    "memo": "メモ",
+}
+# メモ一覧
+MEMO_COLS = {"id": "ID", "name": "銘柄名", "ticker": "コード", "memo": "メモ"}
+# 出口戦略（trades の列, 入力フォームのラベル）。フォームは4列ずつ並べる
+STOP_FIELDS = [
+    ("stop_osaedama", "抑え玉喰わない"),
+    ("stop_itakyushu", "買い板吸収しない"),
+    ("stop_itakieru", "買い板消える"),
+    ("stop_fushi_noforce", "節目ブレイク後勢いなし"),
+    ("stop_hamekomi", "買い板はめこみ"),
+    ("stop_sashene_care", "指値ケア反応悪く下振り懸念"),
+    ("stop_ita_yowaku", "買い板弱くなる"),
+    ("stop_ue_kawanai", "上を買わなくなる"),
+    ("stop_yakan_pts", "夜間PTS"),
+    ("stop_mochikoshi", "持ち越し翌日売り"),
+    ("stop_renkaiato", "連買後"),
+]
+# 勝ちトレード
+WIN_COLS = {
+    "date": "日付", "name": "銘柄名", "ticker": "コード",
+    "grade": "級", "entry_type": "分類", "meigara_quality": "銘柄質",
+    "entry_price": "IN", "exit_price": "OUT",
+    "lot": "ロット", "pnl": "損益",
+}
+# TDnet開示（DISC_PAGE_SIZE は1ページの表示件数）
+DISC_PAGE_SIZE = 50
+DISC_COLS = {
+    "id": "ID",
+    "ticker": "コード",
+    "company_name": "会社名",
+    "title": "タイトル",
+    "disclosed_at": "開示日時",
+    "market_cap": "時価総額",
+    "notified": "通知済",
+}
+# 値上がりランキング
+RANK_COLS = {
+    "ticker": "コード", "name": "銘柄名",
+    "price": "現在値", "change_pct": "前日比%",
+    "volume": "出来高", "market_cap": "時価総額",
+}
+
+# エントリー分類別・銘柄質別 統計
+_CATEGORY_STATS_COLS = {
+    "total": "回数", "wins": "勝ち", "losses": "負け",
+    "win_rate": "勝率", "total_pnl": "累計損益",
+    "avg_pnl": "平均損益", "avg_win": "平均利益",
+    "avg_loss": "平均損失", "expected_value": "期待値",
+    "profit_factor": "PF",
+}
+ENTRY_STATS_COLS = {"entry_type": "エントリー分類", **_CATEGORY_STATS_COLS}
+QUALITY_STATS_COLS = {"quality": "銘柄質", **_CATEGORY_STATS_COLS}
+YEN_STATS_COLS = ["累計損益", "平均損益", "平均利益", "平均損失", "期待値"]
+# 出口戦略 発生率
+STOP_STATS_COLS = {"reason": "出口戦略", "count": "発生回数", "ratio": "発生率"}
+
+GRADES = ["SS", "S", "A"]
+GRADE_R_MAP = {"SS": 10, "S": 5, "A": 1}
+
+
+def _display_frame(data: dict[str, list] | list[dict], cols: dict) -> pd.DataFrame:
+    """取得結果から表示列だけで DataFrame を作って表示名に変える（使わない列は作らない）"""
+    return pd.DataFrame(data, columns=list(cols)).rename(columns=cols)
+
+
+# ===== 表示整形（列単位でまとめて文字列化） =====
+# 級・結果はセルごとの Styler ではなくアイコン付き文字列で色分けする
+GRADE_ICON = {"SS": "🔴 SS", "S": "🟠 S", "A": "🟢 A"}
+RESULT_ICON = {"win": "🟢 win", "lose": "🔴 lose"}
+
+# 率・R は数値のまま渡して書式は column_config に任せる（円は桁区切りが要るので文字列化する）
+_PCT_COLUMN = st.column_config.NumberColumn(format="%.1f%%")
+_R_COLUMN = st.column_config.NumberColumn(format="%+.1fR")
+
+
+def _fmt_icon(df: pd.DataFrame, col: str, icons: dict) -> None:
+    """値をアイコン付き表記に置き換える（未定義の値はそのまま）"""
+    if col in df.columns:
+        df[col] = df[col].map(icons).fillna(df[col])
+
+
+def _fmt_oku(s: pd.Series, missing: str = "") -> pd.Series:
+    """円 → 「N億」表記（欠損・0 は missing）"""
+    s = pd.to_numeric(s, errors="coerce")
+    valid = s.notna() & (s != 0)
+    out = pd.Series(missing, index=s.index, dtype=object)
+    out[valid] = (s[valid] / 100_000_000).map("{:.0f}億".format)
+    return out
+
+
+def _fmt_mark(df: pd.DataFrame, cols: list[str], on: str, off: str = "") -> None:
+    """真偽値の列（複数可）を記号に置き換える"""
+    cols = [c for c in cols if c in df.columns]
+    if cols:
+        df[cols] = np.where(df[cols].fillna(0).astype(bool).to_numpy(), on, off)
+
 
 # ===== パスワード保護 =====
 _auth_password = config.get("auth", {}).get("password", "") or "samuraiakb1A"
@@ -45,6 +209,11 @@ if _auth_password:
                 st.error("パスワードが違います")
         st.stop()
 
+# 表・整形用のライブラリはログイン後に読み込む（ログイン画面の初回表示を軽くする）
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
 st.title("FUDO - 銘柄管理ツール")
 quality_options = config.get("meigara_quality_options", [])
 teii_options = config.get("teii_taishaku_options", ["低位", "貸借", "なし"])
@@ -52,6 +221,107 @@ entry_types = config.get("entry_types", [])
 entry_positions = config.get("entry_positions", [])
 stop_reasons_labels = config.get("exit_strategy_reasons", [])
 r_unit = config.get("risk", {}).get("r_unit", 10000)
+disc_cap_max = config.get("disclosure", {}).get("market_cap_max", 10_000_000_000)
+# 編集フォームの初期選択用
+grade_idx = index_map(GRADES)
+entry_type_idx = index_map(entry_types)
+entry_position_idx = index_map(entry_positions)
+quality_idx = index_map(quality_options)
+
+# ===== 整形済みテーブルのキャッシュ（DB キャッシュと同じ引数で持ち、同時に破棄する） =====
+# 件数・空判定と同じキャッシュ済みの行から作り、DB の読み込みは1回で済ませる
+@st.cache_data(ttl=30, show_spinner=False)
+def _watchlist_table(target_date: str | None = None) -> pd.DataFrame:
+    df_display = _display_frame(_cached_get_stocks(target_date), DISPLAY_COLS)
+    df_display["時価総額"] = _fmt_oku(df_display["時価総額"])
+    _fmt_mark(df_display, ["日足位置"], "○", "×")
+    _fmt_icon(df_display, "級", GRADE_ICON)
+    return df_display
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _trade_history_table(target_date: str | None = None) -> pd.DataFrame:
+    df_show = _display_frame(_cached_get_trades(target_date), SHOW_COLS)
+    # チェックボックス列を✓表示
+    _fmt_mark(df_show, [SHOW_COLS[col] for col, _ in STOP_FIELDS], "✓")
+    # 結果に色付け
+    _fmt_icon(df_show, "結果", RESULT_ICON)
+    return df_show
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _win_trades_table(r_unit: int) -> pd.DataFrame:
+    win_trades = [t for t in _cached_get_trades() if t.get("result") == "win"]
+    df_win_show = _display_frame(win_trades, WIN_COLS)
+    df_win_show["損益R"] = df_win_show["損益"] / r_unit
+    df_win_show["損益"] = df_win_show["損益"].map("¥{:+,.0f}".format)
+    return df_win_show
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _disclosure_table(
+    source: str | None = None,
+    target_date: str | None = None,
+    max_market_cap: float | None = None,
+) -> pa.Table:
+    """5秒ごとに表示するため、Arrow への変換まで済ませて持つ"""
+    disclosures = _cached_get_disclosures(source, target_date, max_market_cap)
+    df_disc_show = _display_frame(disclosures, DISC_COLS)
+    df_disc_show["時価総額"] = _fmt_oku(df_disc_show["時価総額"])
+    _fmt_mark(df_disc_show, ["通知済"], "✓")
+    return pa.Table.from_pandas(df_disc_show, preserve_index=False)
+
+
+# ===== 集計結果のキャッシュ（トレードの書き込み時に破棄する） =====
+@st.cache_data(ttl=30, show_spinner=False)
+def _entry_analysis() -> tuple[list, list, list, pd.Series | None] | None:
+    """3種の集計と出口戦略の棒グラフ用データを返す（トレードなしは None、全勝ならグラフ用データが None）"""
+    all_trades = _cached_get_trades()
+    if not all_trades:
+        return None
+    # 列変換は一度だけ行い、各集計で使い回す
+    trade_cols = TradeColumns.from_trades(all_trades)
+    stop_stats = calc_stop_reason_stats(trade_cols)
+    chart_data = None
+    if not trade_cols.is_win.all():
+        chart_data = pd.Series(
+            [s.count for s in stop_stats], index=[s.reason for s in stop_stats], name="count",
+        )
+    return (
+        calc_entry_type_stats(trade_cols),
+        calc_quality_stats(trade_cols),
+        stop_stats,
+        chart_data,
+    )
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _trade_stats(r_unit: int) -> TradeStats | None:
+    """全トレードの統計（トレードなしは None。r_unit は設定変更の検知用）"""
+    stat_trades = _cached_get_trades()
+    return calc_trade_statistics(stat_trades) if stat_trades else None
+
+
+def _clear_stocks_cache() -> None:
+    _cached_get_stocks.clear()
+    _cached_get_stocks_by_ticker.clear()
+    _cached_get_latest_stock.clear()
+    _watchlist_table.clear()
+
+
+def _clear_trades_cache() -> None:
+    _cached_get_trades.clear()
+    _trade_history_table.clear()
+    _win_trades_table.clear()
+    _entry_analysis.clear()
+    _trade_stats.clear()
+
+
+def _clear_disclosures_cache() -> None:
+    _cached_get_disclosures.clear()
+    _cached_disclosures_by_id.clear()
+    _disclosure_table.clear()
+
 
 # ===== サイドバー：銘柄追加フォーム =====
 with st.sidebar:
@@ -107,6 +377,7 @@ with st.sidebar:
             "memo": f"[増担:{input_mashitanpo}] {input_memo}" if input_mashitanpo == "あり" else input_memo,
             "prev_day_sell_volume": input_prev_sell_vol,
         })
+        _clear_stocks_cache()
         st.success(f"追加しました（ID: {stock_id}、{lot_text}）")
         st.rerun()
 
@@ -123,7 +394,8 @@ tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
 ])
 
 # --- タブ1: ウォッチリスト ---
-with tab1:
+@st.fragment
+def _watchlist_tab():
     def _on_date_change():
         st.session_state["wl_show_all"] = False
 
@@ -137,70 +409,53 @@ with tab1:
             st.session_state["wl_show_all"] = True
 
     show_all = st.session_state.get("wl_show_all", False)
-    stocks = db.get_stocks(None if show_all else str(filter_date))
+    wl_date = None if show_all else str(filter_date)
+    stocks = _cached_get_stocks(wl_date)
 
     if stocks:
-        df = pd.DataFrame(stocks)
-        display_cols = {
-            "id": "ID", "date": "日付", "name": "銘柄名", "ticker": "コード",
-            "market_cap": "時価総額", "margin_buy_ratio": "信用買残%",
-            "fushi": "節目", "pts_volume": "PTS出来高",
-            "prev_day_sell_volume": "前日売り総量",
-            "daily_disclosure_count": "日々公表",
-            "hiduke_position_good": "日足位置", "teii_or_taishaku": "低位/貸借",
-            "meigara_quality": "銘柄質", "grade": "級",
-            "max_r": "最大R", "lot_strategy": "ロット戦略",
-        }
-        df_display = df[[c for c in display_cols if c in df.columns]].rename(columns=display_cols)
-
-        if "時価総額" in df_display.columns:
-            df_display["時価総額"] = df_display["時価総額"].apply(
-                lambda x: f"{x / 100_000_000:.0f}億" if pd.notna(x) and x else ""
+        st.dataframe(_watchlist_table(wl_date), use_container_width=True, hide_index=True)
+
+        # メモ一覧（編集可能）: 開いたときだけ作る。一覧は表1つ、編集は選んだ銘柄の入力欄1つだけ
+        if st.toggle("メモ一覧（編集可能）", key="wl_memo_open"):
+            if "memo_saved_msg" in st.session_state:
+                st.success(st.session_state.pop("memo_saved_msg"))
+            df_memo = _display_frame(stocks, MEMO_COLS)
+            df_memo["メモ"] = df_memo["メモ"].fillna("")
+            st.dataframe(df_memo, use_container_width=True, hide_index=True)
+
+            stocks_by_id = {s["id"]: s for s in stocks}
+            edit_id = st.selectbox(
+                "編集する銘柄",
+                list(stocks_by_id),
+                format_func=lambda i: f"{stocks_by_id[i]['name']}（{stocks_by_id[i]['ticker']}） ID:{i}",
+                key="memo_edit_id",
             )
-        if "日足位置" in df_display.columns:
-            df_display["日足位置"] = df_display["日足位置"].apply(lambda x: "○" if x else "×")
-
-        def grade_color(val):
-            colors = {
-                "SS": "background-color: #ff6b6b; color: white; font-weight: bold",
-                "S": "background-color: #ffa94d; font-weight: bold",
-                "A": "background-color: #69db7c",
-            }
-            return colors.get(val, "")
-
-        styled = df_display.style.applymap(grade_color, subset=["級"] if "級" in df_display.columns else [])
-        st.dataframe(styled, use_container_width=True, hide_index=True)
-
-        # メモ一覧（編集可能）
-        with st.expander("メモ一覧（編集可能）", expanded=False):
-            for s in stocks:
-                memo = s.get("memo", "") or ""
-                st.markdown(f"**{s['name']}（{s['ticker']}）** ID:{s['id']}")
-                new_memo = st.text_area(
-                    f"メモ_{s['id']}",
-                    value=memo,
-                    height=100,
-                    key=f"memo_edit_{s['id']}",
-                    label_visibility="collapsed",
-                )
-                if new_memo != memo:
-                    if st.button(f"保存", key=f"memo_save_{s['id']}"):
-                        db.update_stock(s["id"], {"memo": new_memo})
-                        st.success(f"{s['name']} のメモを保存しました")
-                        st.rerun()
-                st.markdown("---")
+            memo = stocks_by_id[edit_id].get("memo", "") or ""
+            # メモは複数行（ロット追記など）になるため text_area で編集する
+            new_memo = st.text_area("メモ", value=memo, height=150, key=f"memo_edit_{edit_id}")
+            if st.button("保存", key="memo_save", disabled=new_memo == memo):
+                db.update_stock(edit_id, {"memo": new_memo})
+                _clear_stocks_cache()
+                st.session_state["memo_saved_msg"] = f"{stocks_by_id[edit_id]['name']} のメモを保存しました"
+                st.rerun()
 
         with st.expander("銘柄を削除"):
             del_id = st.number_input("削除するID", min_value=1, step=1, key="del_id")
             if st.button("削除実行"):
                 db.delete_stock(del_id)
+                _clear_stocks_cache()
                 st.success(f"ID {del_id} を削除しました")
                 st.rerun()
     else:
         st.info("銘柄が登録されていません。サイドバーから追加してください。")
 
+
+with tab1:
+    _watchlist_tab()
+
 # --- タブ2: トレード記録 ---
-with tab2:
+@st.fragment
+def _trade_tab():
     st.subheader("トレード記録")
 
     with st.form("add_trade_form", clear_on_submit=True):
@@ -211,7 +466,7 @@ with tab2:
             t_name = st.text_input("銘柄名", key="t_name")
             t_ticker = st.text_input("証券コード", key="t_ticker")
         with tc2:
-            t_grade = st.selectbox("級", ["SS", "S", "A"], key="t_grade")
+            t_grade = st.selectbox("級", GRADES, key="t_grade")
             t_entry_type = st.selectbox("エントリー分類", entry_types, key="t_entry_type")
             t_entry_pos = st.selectbox("エントリー位置", entry_positions, key="t_entry_pos")
             t_quality = st.selectbox("銘柄質", quality_options, key="t_quality")
@@ -222,31 +477,11 @@ with tab2:
             t_result = st.selectbox("結果", ["win", "lose"], key="t_result")
 
         st.markdown("##### 出口戦略")
-        sc1, sc2, sc3, sc4 = st.columns(4)
-        with sc1:
-            t_stop1 = st.checkbox("抑え玉喰わない", key="t_stop1")
-        with sc2:
-            t_stop2 = st.checkbox("買い板吸収しない", key="t_stop2")
-        with sc3:
-            t_stop3 = st.checkbox("買い板消える", key="t_stop3")
-        with sc4:
-            t_stop4 = st.checkbox("節目ブレイク後勢いなし", key="t_stop4")
-        sc5, sc6, sc7, sc8 = st.columns(4)
-        with sc5:
-            t_stop5 = st.checkbox("買い板はめこみ", key="t_stop5")
-        with sc6:
-            t_stop6 = st.checkbox("指値ケア反応悪く下振り懸念", key="t_stop6")
-        with sc7:
-            t_stop7 = st.checkbox("買い板弱くなる", key="t_stop7")
-        with sc8:
-            t_stop8 = st.checkbox("上を買わなくなる", key="t_stop8")
-        sc9, sc10, sc11, _ = st.columns(4)
-        with sc9:
-            t_stop9 = st.checkbox("夜間PTS", key="t_stop9")
-        with sc10:
-            t_stop10 = st.checkbox("持ち越し翌日売り", key="t_stop10")
-        with sc11:
-            t_stop11 = st.checkbox("連買後", key="t_stop11")
+        t_stops = []
+        for row_start in range(0, len(STOP_FIELDS), 4):
+            for sc, (_, label) in zip(st.columns(4), STOP_FIELDS[row_start:row_start + 4]):
+                with sc:
+                    t_stops.append(st.checkbox(label, key=f"t_stop{len(t_stops) + 1}"))
 
         t_memo = st.text_area("メモ", height=68, key="t_memo")
         t_submitted = st.form_submit_button("トレード記録を保存", use_container_width=True)
@@ -271,20 +506,11 @@ with tab2:
             "lot": t_lot,
             "pnl": pnl,
             "result": t_result,
-            "stop_osaedama": 1 if t_stop1 else 0,
-            "stop_itakyushu": 1 if t_stop2 else 0,
-            "stop_itakieru": 1 if t_stop3 else 0,
-            "stop_fushi_noforce": 1 if t_stop4 else 0,
-            "stop_hamekomi": 1 if t_stop5 else 0,
-            "stop_sashene_care": 1 if t_stop6 else 0,
-            "stop_ita_yowaku": 1 if t_stop7 else 0,
-            "stop_ue_kawanai": 1 if t_stop8 else 0,
-            "stop_yakan_pts": 1 if t_stop9 else 0,
-            "stop_mochikoshi": 1 if t_stop10 else 0,
-            "stop_renkaiato": 1 if t_stop11 else 0,
+            **{col: 1 if flag else 0 for (col, _), flag in zip(STOP_FIELDS, t_stops)},
             "meigara_quality": t_quality,
             "memo": t_memo,
         })
+        _clear_trades_cache()
         pnl_text = f"+¥{pnl:,.0f}" if pnl >= 0 else f"-¥{abs(pnl):,.0f}"
         st.success(f"記録しました（ID: {trade_id}、損益: {pnl_text}）")
         st.rerun()
@@ -303,46 +529,14 @@ with tab2:
         st.write("")
         trade_show_all = st.button("全件表示", key="trade_show_all")
 
-    if trade_show_all:
-        trades = db.get_trades()
-    elif trade_search_date:
-        trades = db.get_trades(str(trade_search_date))
+    if trade_show_all or not trade_search_date:
+        trade_date = None
     else:
-        trades = db.get_trades()
+        trade_date = str(trade_search_date)
+    trades = _cached_get_trades(trade_date)
 
     if trades:
-        df_t = pd.DataFrame(trades)
-        show_cols = {
-            "id": "ID", "date": "日付", "name": "銘柄名", "ticker": "コード",
-            "grade": "級", "entry_type": "分類", "entry_position": "位置",
-            "meigara_quality": "銘柄質",
-            "entry_price": "IN", "exit_price": "OUT",
-            "lot": "ロット", "pnl": "損益", "result": "結果",
-            "stop_osaedama": "抑え玉", "stop_itakyushu": "板吸収",
-            "stop_itakieru": "板消え", "stop_fushi_noforce": "勢いなし",
-            "stop_hamekomi": "はめこみ", "stop_sashene_care": "指値ケア",
-            "stop_ita_yowaku": "板弱化",
-            "stop_ue_kawanai": "上買わず", "stop_yakan_pts": "夜間PTS",
-            "stop_mochikoshi": "持越翌日売", "stop_renkaiato": "連買後",
-            "memo": "メモ",
-        }
-        df_show = df_t[[c for c in show_cols if c in df_t.columns]].rename(columns=show_cols)
-
-        # チェックボックス列を○×表示
-        for col in ["抑え玉", "板吸収", "板消え", "勢いなし", "はめこみ", "指値ケア", "板弱化", "上買わず", "夜間PTS", "持越翌日売", "連買後"]:
-            if col in df_show.columns:
-                df_show[col] = df_show[col].apply(lambda x: "✓" if x else "")
-
-        # 結果に色付け
-        def result_color(val):
-            if val == "win":
-                return "background-color: #69db7c; font-weight: bold"
-            elif val == "lose":
-                return "background-color: #ff6b6b; color: white"
-            return ""
-
-        styled_t = df_show.style.applymap(result_color, subset=["結果"] if "結果" in df_show.columns else [])
-        st.dataframe(styled_t, use_container_width=True, hide_index=True)
+        st.dataframe(_trade_history_table(trade_date), use_container_width=True, hide_index=True)
         st.caption(f"表示件数: {len(trades)}件")
 
         # --- トレード記録を編集 ---
@@ -365,11 +559,10 @@ with tab2:
                         ed_name = st.text_input("銘柄名", value=ed.get("name", ""), key="ed_name")
                         ed_ticker = st.text_input("証券コード", value=ed.get("ticker", ""), key="ed_ticker")
                     with ec2:
-                        _grades = ["SS", "S", "A"]
-                        ed_grade = st.selectbox("級", _grades, index=_grades.index(ed["grade"]) if ed.get("grade") in _grades else 0, key="ed_grade")
-                        ed_entry_type = st.selectbox("エントリー分類", entry_types, index=entry_types.index(ed["entry_type"]) if ed.get("entry_type") in entry_types else 0, key="ed_entry_type")
-                        ed_entry_pos = st.selectbox("エントリー位置", entry_positions, index=entry_positions.index(ed["entry_position"]) if ed.get("entry_position") in entry_positions else 0, key="ed_entry_pos")
-                        ed_quality = st.selectbox("銘柄質", quality_options, index=quality_options.index(ed["meigara_quality"]) if ed.get("meigara_quality") in quality_options else 0, key="ed_quality")
+                        ed_grade = st.selectbox("級", GRADES, index=grade_idx.get(ed.get("grade"), 0), key="ed_grade")
+                        ed_entry_type = st.selectbox("エントリー分類", entry_types, index=entry_type_idx.get(ed.get("entry_type"), 0), key="ed_entry_type")
+                        ed_entry_pos = st.selectbox("エントリー位置", entry_positions, index=entry_position_idx.get(ed.get("entry_position"), 0), key="ed_entry_pos")
+                        ed_quality = st.selectbox("銘柄質", quality_options, index=quality_idx.get(ed.get("meigara_quality"), 0), key="ed_quality")
                         ed_lot = st.number_input("ロット", value=ed.get("lot", 0), min_value=0, step=100, key="ed_lot")
                     with ec3:
                         ed_entry_price = st.text_input("エントリー価格", value=str(ed.get("entry_price", 0)), key="ed_entry_price")
@@ -401,6 +594,7 @@ with tab2:
                         "meigara_quality": ed_quality,
                         "memo": ed_memo,
                     })
+                    _clear_trades_cache()
                     st.success(f"ID {ed['id']} を更新しました")
                     st.session_state.pop("edit_trade_data", None)
                     st.rerun()
@@ -409,98 +603,81 @@ with tab2:
             del_tid = st.number_input("削除するID", min_value=1, step=1, key="del_tid")
             if st.button("削除実行", key="del_trade_btn"):
                 db.delete_trade(del_tid)
+                _clear_trades_cache()
                 st.success(f"ID {del_tid} を削除しました")
                 st.rerun()
     else:
         st.info("トレード記録がありません。上のフォームから追加してください。")
 
+
+with tab2:
+    _trade_tab()
+
 # --- タブ3: エントリー分析 ---
-with tab3:
+@st.fragment
+def _entry_analysis_tab():
     st.subheader("エントリー分類別 勝率")
 
-    all_trades = db.get_trades()
+    analysis = _entry_analysis()
+
+    if analysis:
+        entry_stats, quality_stats, stop_stats, chart_data = analysis
 
-    if all_trades:
         # エントリー分類別 勝率テーブル
-        entry_stats = calc_entry_type_stats(all_trades)
-        df_es = pd.DataFrame(entry_stats)
-        df_es = df_es.rename(columns={
-            "entry_type": "エントリー分類",
-            "total": "回数",
-            "wins": "勝ち",
-            "losses": "負け",
-            "win_rate": "勝率",
-            "total_pnl": "累計損益",
-            "avg_pnl": "平均損益",
-            "avg_win": "平均利益",
-            "avg_loss": "平均損失",
-            "expected_value": "期待値",
-            "profit_factor": "PF",
-        })
+        df_es = pd.DataFrame([s.to_dict() for s in entry_stats])
+        df_es = df_es.rename(columns=ENTRY_STATS_COLS)
 
         # 勝率を%表示
-        df_es["勝率"] = df_es["勝率"].apply(lambda x: f"{x * 100:.1f}%")
-        for col in ["累計損益", "平均損益", "平均利益", "平均損失", "期待値"]:
-            df_es[col] = df_es[col].apply(lambda x: f"¥{x:,.0f}")
+        df_es["勝率"] = df_es["勝率"] * 100
+        for col in YEN_STATS_COLS:
+            df_es[col] = df_es[col].map("¥{:,.0f}".format)
 
-        st.dataframe(df_es, use_container_width=True, hide_index=True)
+        st.dataframe(df_es, use_container_width=True, hide_index=True, column_config={"勝率": _PCT_COLUMN})
 
         # 銘柄質別 勝率
         st.markdown("---")
         st.subheader("銘柄質別 勝率")
 
-        quality_stats = calc_quality_stats(all_trades)
-        df_qs = pd.DataFrame(quality_stats)
-        df_qs = df_qs.rename(columns={
-            "quality": "銘柄質",
-            "total": "回数", "wins": "勝ち", "losses": "負け",
-            "win_rate": "勝率", "total_pnl": "累計損益",
-            "avg_pnl": "平均損益", "avg_win": "平均利益",
-            "avg_loss": "平均損失", "expected_value": "期待値",
-            "profit_factor": "PF",
-        })
-        df_qs["勝率"] = df_qs["勝率"].apply(lambda x: f"{x * 100:.1f}%")
-        for col in ["累計損益", "平均損益", "平均利益", "平均損失", "期待値"]:
-            df_qs[col] = df_qs[col].apply(lambda x: f"¥{x:,.0f}")
+        df_qs = pd.DataFrame([s.to_dict() for s in quality_stats])
+        df_qs = df_qs.rename(columns=QUALITY_STATS_COLS)
+        df_qs["勝率"] = df_qs["勝率"] * 100
+        for col in YEN_STATS_COLS:
+            df_qs[col] = df_qs[col].map("¥{:,.0f}".format)
 
-        st.dataframe(df_qs, use_container_width=True, hide_index=True)
+        st.dataframe(df_qs, use_container_width=True, hide_index=True, column_config={"勝率": _PCT_COLUMN})
 
         # 損切り理由分析
         st.markdown("---")
         st.subheader("出口戦略 発生率")
 
-        stop_stats = calc_stop_reason_stats(all_trades)
-        df_ss = pd.DataFrame(stop_stats)
-        df_ss = df_ss.rename(columns={
-            "reason": "出口戦略",
-            "count": "発生回数",
-            "ratio": "発生率",
-        })
-        df_ss["発生率"] = df_ss["発生率"].apply(lambda x: f"{x * 100:.1f}%")
+        df_ss = pd.DataFrame([s.to_dict() for s in stop_stats])
+        df_ss = df_ss.rename(columns=STOP_STATS_COLS)
+        df_ss["発生率"] = df_ss["発生率"] * 100
 
-        st.dataframe(df_ss, use_container_width=True, hide_index=True)
+        st.dataframe(df_ss, use_container_width=True, hide_index=True, column_config={"発生率": _PCT_COLUMN})
 
         # 棒グラフ
-        loss_trades = [t for t in all_trades if t.get("result") != "win"]
-        if loss_trades:
-            chart_data = pd.DataFrame(stop_stats)
-            chart_data = chart_data.set_index("reason")["count"]
+        if chart_data is not None:
             st.bar_chart(chart_data)
     else:
         st.info("トレード記録がありません。「トレード記録」タブから追加してください。")
 
+
+with tab3:
+    _entry_analysis_tab()
+
 # --- タブ4: 統計 ---
-with tab4:
+@st.fragment
+def _stats_tab():
     st.subheader("トレード統計（Rベース）")
 
-    stat_trades = db.get_trades()
+    stats = _trade_stats(r_unit)
 
-    if stat_trades:
-        stats = calc_trade_statistics(stat_trades)
-        ru = stats["r_unit"]
+    if stats:
+        ru = stats.r_unit
 
         # ===== 精度表示 =====
-        accuracy = stats["accuracy"]
+        accuracy = stats.accuracy
         if "高精度" in accuracy:
             st.success(f"📏 精度: {accuracy}")
         elif "中精度" in accuracy:
@@ -513,81 +690,74 @@ with tab4:
         # ===== メイン指標 =====
         st.markdown("##### 期待値 = (勝率 × 平均利益R) − (負率 × 平均損失R)")
         m1, m2, m3, m4 = st.columns(4)
-        ev_r = stats["expected_value_r"]
+        ev_r = stats.expected_value_r
         m1.metric("期待値", f"{ev_r:+.2f} R", delta=f"¥{ev_r * ru:+,.0f}")
-        m2.metric("勝率", f"{stats['win_rate'] * 100:.1f}%")
-        m3.metric("PF", f"{stats['profit_factor']:.2f}")
-        m4.metric("累計損益", f"{stats['total_pnl_r']:+.1f} R", delta=f"¥{stats['total_pnl']:+,.0f}")
+        m2.metric("勝率", f"{stats.win_rate * 100:.1f}%")
+        m3.metric("PF", f"{stats.profit_factor:.2f}")
+        m4.metric("累計損益", f"{stats.total_pnl_r:+.1f} R", delta=f"¥{stats.total_pnl:+,.0f}")
 
         # ===== 詳細指標 =====
         st.markdown("---")
         d1, d2, d3, d4 = st.columns(4)
-        d1.metric("トレード数", f"{stats['total']}回")
-        d2.metric(f"勝ち / 負け", f"{stats['wins']}W / {stats['losses']}L")
-        d3.metric("最大連勝", f"{stats['consecutive_wins']}連勝")
-        d4.metric("最大連敗", f"{stats['consecutive_losses']}連敗")
+        d1.metric("トレード数", f"{stats.total}回")
+        d2.metric(f"勝ち / 負け", f"{stats.wins}W / {stats.losses}L")
+        d3.metric("最大連勝", f"{stats.consecutive_wins}連勝")
+        d4.metric("最大連敗", f"{stats.consecutive_losses}連敗")
 
         e1, e2, e3, e4 = st.columns(4)
-        e1.metric("平均利益", f"{stats['avg_win_r']:.2f} R", delta=f"¥{stats['avg_win_r'] * ru:,.0f}")
-        e2.metric("平均損失", f"{stats['avg_loss_r']:.2f} R", delta=f"-¥{stats['avg_loss_r'] * ru:,.0f}", delta_color="inverse")
-        e3.metric("最大利益", f"{stats['max_win_r']:.2f} R")
-        e4.metric("最大損失", f"{stats['max_loss_r']:.2f} R")
+        e1.metric("平均利益", f"{stats.avg_win_r:.2f} R", delta=f"¥{stats.avg_win_r * ru:,.0f}")
+        e2.metric("平均損失", f"{stats.avg_loss_r:.2f} R", delta=f"-¥{stats.avg_loss_r * ru:,.0f}", delta_color="inverse")
+        e3.metric("最大利益", f"{stats.max_win_r:.2f} R")
+        e4.metric("最大損失", f"{stats.max_loss_r:.2f} R")
 
-        st.metric("損益分岐勝率", f"{stats['breakeven_winrate'] * 100:.1f}%")
+        st.metric("損益分岐勝率", f"{stats.breakeven_winrate * 100:.1f}%")
 
         # ===== 次回許容ロット =====
         st.markdown("---")
         st.subheader("次回許容ロット")
 
-        lot_info = stats["next_lot_info"]
+        lot_info = stats.next_lot_info
         st.info(f"💡 {lot_info.get('reason', '')}")
 
-        nl1, nl2, nl3 = st.columns(3)
-        nl1.metric("SS級", f"最大 {lot_info.get('SS', '-')}R（¥{lot_info.get('SS', 0) * ru:,}）")
-        nl2.metric("S級", f"最大 {lot_info.get('S', '-')}R（¥{lot_info.get('S', 0) * ru:,}）")
-        nl3.metric("A級", f"最大 {lot_info.get('A', '-')}R（¥{lot_info.get('A', 0) * ru:,}）")
+        for col, g in zip(st.columns(3), GRADES):
+            r = lot_info.get(g)
+            col.metric(f"{g}級", f"最大 {'-' if r is None else r}R（¥{(r or 0) * ru:,}）")
 
         # ===== 勝ちトレード抽出 =====
         st.markdown("---")
         st.subheader("勝ちトレード抽出")
 
-        win_trades = stats["win_trades"]
-        if win_trades:
-            df_win = pd.DataFrame(win_trades)
-            win_cols = {
-                "date": "日付", "name": "銘柄名", "ticker": "コード",
-                "grade": "級", "entry_type": "分類", "meigara_quality": "銘柄質",
-                "entry_price": "IN", "exit_price": "OUT",
-                "lot": "ロット", "pnl": "損益",
-            }
-            df_win_show = df_win[[c for c in win_cols if c in df_win.columns]].rename(columns=win_cols)
-            if "損益" in df_win_show.columns:
-                df_win_show["損益R"] = df_win_show["損益"].apply(lambda x: f"{x / ru:+.1f}R")
-                df_win_show["損益"] = df_win_show["損益"].apply(lambda x: f"¥{x:+,.0f}")
-            st.dataframe(df_win_show, use_container_width=True, hide_index=True)
+        if stats.wins:
+            st.dataframe(_win_trades_table(ru), use_container_width=True, hide_index=True, column_config={"損益R": _R_COLUMN})
         else:
             st.info("勝ちトレードはまだありません。")
     else:
         st.info("トレード記録がありません。「トレード記録」タブから追加してください。")
 
+
+with tab4:
+    _stats_tab()
+
 # --- タブ5: ロット計算 ---
-with tab5:
+@st.fragment
+def _lot_tab():
     st.subheader("Rベース ロット計算")
 
     col1, col2 = st.columns(2)
     with col1:
-        lot_grade = st.selectbox("級", ["SS", "S", "A"], key="lot_grade")
-        grade_r_map = {"SS": 10, "S": 5, "A": 1}
-        lot_default_r = grade_r_map[lot_grade]
+        lot_grade = st.selectbox("級", GRADES, key="lot_grade")
+        lot_default_r = GRADE_R_MAP[lot_grade]
         lot_max_r = st.slider("R数", min_value=1, max_value=20, value=lot_default_r, step=1, key="lot_r_slider")
         lot_r_unit = st.slider("1Rの金額（円）", min_value=1000, max_value=100000, value=r_unit, step=1000, key="lot_r_unit")
         st.info(f"最大 {lot_max_r}R = ¥{lot_max_r * lot_r_unit:,}")
-    with col2:
+    # 価格の入力中は再実行せず、「計算」でまとめて送る（級・R数は上限表示のため即時反映）
+    with col2, st.form("lot_form", border=False):
         lot_ticker_input = st.text_input("証券コード（ウォッチリスト登録用）", value="", key="lot_ticker_input", placeholder="例: 6920")
         lot_entry_str = st.text_input("エントリー価格（円）", value="1000", key="lot_entry")
         lot_stop_str = st.text_input("損切り価格（円）", value="950", key="lot_stop")
+        lot_submitted = st.form_submit_button("計算")
 
-    if st.button("計算", key="calc_lot"):
+    if lot_submitted:
         try:
             lot_entry = float(lot_entry_str) if lot_entry_str else 0
             lot_stop = float(lot_stop_str) if lot_stop_str else 0
@@ -615,15 +785,15 @@ with tab5:
         c3.metric("ポジションサイズ", f"¥{result['position_size']:,.0f}")
 
     # --- ウォッチリストにロット追加 ---
-    if st.session_state.get("lot_calc_result") and st.session_state.get("lot_calc_ticker"):
-        _ticker = st.session_state["lot_calc_ticker"]
-        _result = st.session_state["lot_calc_result"]
-        _grade = st.session_state["lot_calc_grade"]
-        _entry = st.session_state.get("lot_calc_entry", 0)
-
-        matched = db.get_stocks_by_ticker(_ticker)
-        if matched:
-            latest = matched[0]
+    ss = st.session_state
+    _result = ss.get("lot_calc_result")
+    _ticker = ss.get("lot_calc_ticker")
+    if _result and _ticker:
+        _grade = ss["lot_calc_grade"]
+        _entry = ss.get("lot_calc_entry", 0)
+
+        latest = _cached_get_latest_stock(_ticker)
+        if latest:
             lot_text = f"{_grade}級 / {_result['lot']}株 / IN:¥{_entry:,.0f} / リスク:¥{_result['risk_amount']:,.0f}"
             st.markdown("---")
             st.markdown(f"**{latest['name']}（{_ticker}）** のウォッチリスト（ID: {latest['id']}）にロット情報を追加")
@@ -636,26 +806,35 @@ with tab5:
                     "lot_strategy": lot_text,
                     "memo": new_memo,
                 })
+                _clear_stocks_cache()
                 st.success(f"{latest['name']} にロット情報を追加しました: {lot_text}")
-                st.session_state.pop("lot_calc_result", None)
-                st.session_state.pop("lot_calc_ticker", None)
+                ss.pop("lot_calc_result", None)
+                ss.pop("lot_calc_ticker", None)
                 st.rerun()
         else:
             st.info(f"証券コード {_ticker} はウォッチリストに登録されていません。先にサイドバーから銘柄を追加してください。")
 
+
+with tab5:
+    _lot_tab()
+
 # --- タブ6: 期待値計算 ---
-with tab6:
+@st.fragment
+def _ev_tab():
     st.subheader("トレード期待値計算")
 
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        ev_winrate = st.number_input("勝率（%）", value=50.0, min_value=0.0, max_value=100.0, step=1.0)
-    with col2:
-        ev_win = st.number_input("平均利益（円）", value=30000, step=1000)
-    with col3:
-        ev_loss = st.number_input("平均損失（円）", value=20000, step=1000)
+    # 入力は「計算」でまとめて送る
+    with st.form("ev_form", border=False):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            ev_winrate = st.number_input("勝率（%）", value=50.0, min_value=0.0, max_value=100.0, step=1.0)
+        with col2:
+            ev_win = st.number_input("平均利益（円）", value=30000, step=1000)
+        with col3:
+            ev_loss = st.number_input("平均損失（円）", value=20000, step=1000)
+        ev_submitted = st.form_submit_button("計算")
 
-    if st.button("計算", key="calc_ev"):
+    if ev_submitted:
         result = calc_expected_value(
             win_rate=ev_winrate / 100,
             avg_win=ev_win,
@@ -671,24 +850,32 @@ with tab6:
         else:
             st.warning("期待値はマイナスです。ルールの見直しを検討してください。")
 
+
+with tab6:
+    _ev_tab()
+
 # --- タブ7: TDnet監視 ---
 with tab7:
     st.subheader("TDnet適時開示監視（時価総額100億以下）")
 
+    # 同じ5秒枠内の再実行（ボタン操作など）では TDnet に再アクセスしない
+    @st.cache_data(ttl=5, show_spinner=False)
+    def _fetch_tdnet_cached() -> list[dict]:
+        from tdnet_fetch import fetch_tdnet_disclosures
+        return fetch_tdnet_disclosures()
+
     # 5秒ごとに自動スキャンするフラグメント
     @st.fragment(run_every=timedelta(seconds=5))
     def _tdnet_fragment():
         try:
-            from tdnet_fetch import fetch_tdnet_disclosures
             from notifier import notify_disclosures as _notify_disc
 
             now_jst = datetime.now(JST)
             st.caption(f"自動スキャン中（5秒間隔）　最終更新: {now_jst.strftime('%H:%M:%S')}")
 
-            items = fetch_tdnet_disclosures()
+            items = _fetch_tdnet_cached()
             new_items = []
-            for item in items:
-                disc_id = db.add_disclosure(item)
+            for item, disc_id in zip(items, db.add_disclosures(items)):
                 if disc_id is not None:
                     item["id"] = disc_id
                     new_items.append(item)
@@ -696,51 +883,56 @@ with tab7:
             if new_items:
                 try:
                     _notify_disc(new_items, source="TDnet")
-                    for it in new_items:
-                        if it.get("id"):
-                            db.mark_disclosure_notified(it["id"])
+                    db.mark_disclosures_notified([it["id"] for it in new_items if it.get("id")])
                 except Exception as _ne:
                     st.warning(f"LINE通知エラー: {_ne}")
+                _clear_disclosures_cache()
                 st.success(f"新着: {len(new_items)}件 → LINE通知済")
 
             # 当日のTDnet開示一覧を表示
-            disclosures = db.get_disclosures(source="tdnet", target_date=str(today_jst()))
+            # 5秒ごとの再実行でも、開示に変化がなければ整形済みの表を使い回す
+            disc_args = ("tdnet", str(now_jst.date()), disc_cap_max)
+            disclosures = _cached_get_disclosures(*disc_args)
             if disclosures:
-                df_disc = pd.DataFrame(disclosures)
-                disc_cols = {
-                    "id": "ID",
-                    "ticker": "コード",
-                    "company_name": "会社名",
-                    "title": "タイトル",
-                    "disclosed_at": "開示日時",
-                    "market_cap": "時価総額",
-                    "notified": "通知済",
-                }
-                df_disc_show = df_disc[[c for c in disc_cols if c in df_disc.columns]].rename(columns=disc_cols)
-                if "時価総額" in df_disc_show.columns:
-                    df_disc_show["時価総額"] = df_disc_show["時価総額"].apply(
-                        lambda x: f"{x / 100_000_000:.0f}億" if pd.notna(x) and x else ""
-                    )
-                if "通知済" in df_disc_show.columns:
-                    df_disc_show["通知済"] = df_disc_show["通知済"].apply(lambda x: "✓" if x else "")
-                st.dataframe(df_disc_show, use_container_width=True, hide_index=True)
-                st.caption(f"表示件数: {len(disclosures)}件")
-
-                with st.expander("ウォッチリストに追加"):
-                    add_disc_id = st.number_input("開示ID", min_value=1, step=1, key="add_disc_id")
-                    if st.button("ウォッチリストに追加", key="add_disc_to_wl"):
-                        target = next((d for d in disclosures if d["id"] == add_disc_id), None)
-                        if target:
-                            stock_id = db.add_stock({
-                                "date": str(today_jst()),
-                                "name": target["company_name"],
-                                "ticker": target["ticker"],
-                                "market_cap": target.get("market_cap"),
-                                "memo": f"TDnet開示: {target.get('title', '')}",
-                            })
-                            st.success(f"{target['company_name']}（{target['ticker']}）をウォッチリストに追加しました（ID: {stock_id}）")
-                        else:
-                            st.error("指定されたIDの開示が見つかりません")
+                # 件数が多い日は1ページ分だけ送る（全件はキャッシュ側に保持）
+                n_pages = -(-len(disclosures) // DISC_PAGE_SIZE)
+                page = 1
+                if n_pages > 1:
+                    page = min(int(st.number_input("ページ", min_value=1, step=1, key="disc_page")), n_pages)
+                start = (page - 1) * DISC_PAGE_SIZE
+                st.dataframe(
+                    _disclosure_table(*disc_args).slice(start, DISC_PAGE_SIZE),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+                st.caption(f"表示件数: {len(disclosures)}件（{page}/{n_pages}ページ）")
+
+                # 追加はボタンの on_click で先に済ませ、結果だけこの実行で表示する
+                def _add_disclosure_to_watchlist() -> None:
+                    target = _cached_disclosures_by_id(*disc_args).get(st.session_state["add_disc_id"])
+                    if target is None:
+                        msg = ("error", "指定されたIDの開示が見つかりません")
+                    elif any(s["date"] == disc_args[1] for s in _cached_get_stocks_by_ticker(target["ticker"])):
+                        msg = ("warning", f"{target['company_name']}（{target['ticker']}）は本日のウォッチリストに登録済みです")
+                    else:
+                        stock_id = db.add_stock({
+                            "date": disc_args[1],
+                            "name": target["company_name"],
+                            "ticker": target["ticker"],
+                            "market_cap": target.get("market_cap"),
+                            "memo": f"TDnet開示: {target.get('title', '')}",
+                        })
+                        _clear_stocks_cache()
+                        msg = ("success", f"{target['company_name']}（{target['ticker']}）をウォッチリストに追加しました（ID: {stock_id}）")
+                    st.session_state["disc_add_msg"] = msg
+
+                # 5秒ごとに再実行されるため、入力欄は開いたときだけ作る
+                if st.toggle("ウォッチリストに追加", key="show_add_form"):
+                    st.number_input("開示ID", min_value=1, step=1, key="add_disc_id")
+                    st.button("ウォッチリストに追加", key="add_disc_to_wl", on_click=_add_disclosure_to_watchlist)
+                    if "disc_add_msg" in st.session_state:
+                        kind, text = st.session_state.pop("disc_add_msg")
+                        getattr(st, kind)(text)
             else:
                 st.info("当日のTDnet開示（時価総額100億以下）はまだありません。自動スキャン中...")
 
@@ -773,35 +965,42 @@ with tab8:
             rk_line_notify = st.checkbox("LINE通知ON", value=True, key="rk_line_notify")
 
     st.caption(
-        f"現在の条件: 前日比+{st.session_state.get('rk_pct_min', 5.0):.1f}%以上 / "
-        f"出来高{st.session_state.get('rk_vol_min', 100)}万株以上 / "
-        f"時価総額{st.session_state.get('rk_cap_max', 100)}億以下 / "
-        f"{'貸借銘柄のみ' if st.session_state.get('rk_taishaku_only', True) else '全銘柄'}"
+        f"現在の条件: 前日比+{rk_pct_min:.1f}%以上 / "
+        f"出来高{rk_vol_min}万株以上 / "
+        f"時価総額{rk_cap_max}億以下 / "
+        f"{'貸借銘柄のみ' if rk_taishaku_only else '全銘柄'}"
     )
 
+    # フラグメント間隔（2分）より少し短い TTL で、同じ条件の取得は使い回す
+    # （条件入力などで全体が再実行されても kabutan に再アクセスしない）
+    @st.cache_data(ttl=110, show_spinner=False)
+    def _cached_rising_stocks(pct_min: float, vol_min: int, cap_max: int, top_n: int, taishaku_only: bool) -> list[dict]:
+        from ranking_monitor import fetch_kabutan_rising_stocks
+        return fetch_kabutan_rising_stocks(
+            pct_min=pct_min,
+            vol_min=vol_min,
+            cap_max=cap_max,
+            top_n=top_n,
+            taishaku_only=taishaku_only,
+        )
+
     @st.fragment(run_every=timedelta(seconds=120))
     def _ranking_fragment():
         try:
-            from ranking_monitor import fetch_kabutan_rising_stocks
             from notifier import send_line as _send_line
 
             now_jst = datetime.now(JST)
             st.caption(f"自動スキャン中（2分間隔）　最終更新: {now_jst.strftime('%H:%M:%S')}")
 
-            pct_min      = st.session_state.get("rk_pct_min", 5.0)
-            vol_min      = int(st.session_state.get("rk_vol_min", 100)) * 10_000
-            cap_max      = int(st.session_state.get("rk_cap_max", 100)) * 100_000_000
-            top_n        = int(st.session_state.get("rk_top_n", 50))
-            taishaku_only = st.session_state.get("rk_taishaku_only", True)
-            line_notify  = st.session_state.get("rk_line_notify", True)
-
-            hits = fetch_kabutan_rising_stocks(
-                pct_min=pct_min,
-                vol_min=vol_min,
-                cap_max=cap_max,
-                top_n=top_n,
-                taishaku_only=taishaku_only,
-            )
+            ss = st.session_state
+            pct_min      = ss.get("rk_pct_min", 5.0)
+            vol_min      = int(ss.get("rk_vol_min", 100)) * 10_000
+            cap_max      = int(ss.get("rk_cap_max", 100)) * 100_000_000
+            top_n        = int(ss.get("rk_top_n", 50))
+            taishaku_only = ss.get("rk_taishaku_only", True)
+            line_notify  = ss.get("rk_line_notify", True)
+
+            hits = _cached_rising_stocks(pct_min, vol_min, cap_max, top_n, taishaku_only)
 
             if hits:
                 # 未通知のものだけLINE通知
@@ -832,21 +1031,10 @@ with tab8:
                             st.warning(f"LINE通知エラー: {_le}")
 
                 # テーブル表示
-                df_rk = pd.DataFrame(hits)
-                col_map = {
-                    "ticker": "コード", "name": "銘柄名",
-                    "price": "現在値", "change_pct": "前日比%",
-                    "volume": "出来高", "market_cap": "時価総額",
-                }
-                df_show = df_rk[[c for c in col_map if c in df_rk.columns]].rename(columns=col_map)
-                if "時価総額" in df_show.columns:
-                    df_show["時価総額"] = df_show["時価総額"].apply(
-                        lambda x: f"{x / 100_000_000:.0f}億" if x else "不明"
-                    )
-                if "出来高" in df_show.columns:
-                    df_show["出来高"] = df_show["出来高"].apply(lambda x: f"{x // 10000}万株")
-                if "前日比%" in df_show.columns:
-                    df_show["前日比%"] = df_show["前日比%"].apply(lambda x: f"+{x:.1f}%")
+                df_show = _display_frame(hits, RANK_COLS)
+                df_show["時価総額"] = _fmt_oku(df_show["時価総額"], missing="不明")
+                df_show["出来高"] = (df_show["出来高"] // 10000).astype(str) + "万株"
+                df_show["前日比%"] = df_show["前日比%"].map("+{:.1f}%".format)
                 st.dataframe(df_show, use_container_width=True, hide_index=True)
                 st.caption(f"HIT件数: {len(hits)}件")
             else:
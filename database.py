@@ -13,6 +13,8 @@ def get_connection():
     conn = sqlite3.connect(str(DB_PATH))
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
+    # WAL ではチェックポイント時のみ fsync でも整合性は保たれる
+    conn.execute("PRAGMA synchronous=NORMAL")
     return conn
 
 
@@ -106,6 +108,9 @@ def init_db():
     conn.execute("""
         CREATE INDEX IF NOT EXISTS idx_disclosures_disclosed_at ON disclosures(disclosed_at)
     """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_disclosures_source_cap ON disclosures(source, market_cap)
+    """)
 
     conn.execute("""
         CREATE TABLE IF NOT EXISTS price_alerts (
@@ -237,12 +242,23 @@ def get_stocks_by_ticker(ticker: str) -> list[dict]:
     """証券コードで銘柄履歴を取得する"""
     conn = get_connection()
     rows = conn.execute(
-        "SELECT * FROM watchlist WHERE ticker = ? ORDER BY date DESC", (ticker,)
+        "SELECT * FROM watchlist WHERE ticker = ? ORDER BY date DESC, id DESC", (ticker,)
     ).fetchall()
     conn.close()
     return [dict(row) for row in rows]
 
 
+def get_latest_stock_by_ticker(ticker: str) -> dict | None:
+    """証券コードの最新の銘柄を1件だけ取得する（get_stocks_by_ticker(ticker)[0] と同じ行）"""
+    conn = get_connection()
+    # 同日の行は id の大きい方（get_stocks_by_ticker と同じ並び）
+    row = conn.execute(
+        "SELECT * FROM watchlist WHERE ticker = ? ORDER BY date DESC, id DESC LIMIT 1", (ticker,)
+    ).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
 # ========== トレード記録 ==========
 
 def add_trade(data: dict) -> int:
@@ -426,23 +442,22 @@ def deactivate_alert(alert_id: int):
 
 # ========== 適時開示 ==========
 
-def add_disclosure(data: dict) -> int | None:
-    """適時開示を追加する（重複チェック: ticker + title + disclosed_at）"""
-    conn = get_connection()
-    existing = conn.execute(
-        "SELECT id FROM disclosures WHERE ticker = ? AND title = ? AND disclosed_at = ?",
-        (data["ticker"], data.get("title", ""), data.get("disclosed_at", "")),
-    ).fetchone()
-    if existing:
-        conn.close()
-        return None
+_DISCLOSURE_EXISTS_SQL = "SELECT 1 FROM disclosures WHERE ticker = ? AND title = ? AND disclosed_at = ?"
 
-    cur = conn.execute("""
-        INSERT INTO disclosures
-            (ticker, company_name, market, disclosure_type, title, url,
-             disclosed_at, market_cap, source, notified)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+_DISCLOSURE_INSERT_SQL = """
+    INSERT INTO disclosures
+        (ticker, company_name, market, disclosure_type, title, url,
+         disclosed_at, market_cap, source, notified)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _disclosure_key(data: dict) -> tuple:
+    return (data["ticker"], data.get("title", ""), data.get("disclosed_at", ""))
+
+
+def _disclosure_row(data: dict) -> tuple:
+    return (
         data["ticker"],
         data.get("company_name", ""),
         data.get("market", ""),
@@ -453,15 +468,37 @@ def add_disclosure(data: dict) -> int | None:
         data.get("market_cap"),
         data.get("source", ""),
         0,
-    ))
-    conn.commit()
-    disclosure_id = cur.lastrowid
+    )
+
+
+def add_disclosure(data: dict) -> int | None:
+    """適時開示を追加する（重複チェック: ticker + title + disclosed_at）"""
+    return add_disclosures([data])[0]
+
+
+def add_disclosures(items: list[dict]) -> list[int | None]:
+    """適時開示をまとめて追加する（1トランザクション。戻り値は items と同順の ID、重複は None）"""
+    ids: list[int | None] = []
+    seen: set[tuple] = set()
+    conn = get_connection()
+    with conn:
+        for data in items:
+            key = _disclosure_key(data)
+            if key in seen or conn.execute(_DISCLOSURE_EXISTS_SQL, key).fetchone():
+                ids.append(None)
+                continue
+            seen.add(key)
+            ids.append(conn.execute(_DISCLOSURE_INSERT_SQL, _disclosure_row(data)).lastrowid)
     conn.close()
-    return disclosure_id
+    return ids
 
 
-def get_disclosures(source: str = None, target_date: str = None) -> list[dict]:
-    """適時開示一覧を取得する"""
+def get_disclosures(
+    source: str = None,
+    target_date: str = None,
+    max_market_cap: float = None,
+) -> list[dict]:
+    """適時開示一覧を取得する（max_market_cap 指定時は時価総額不明のものも含める）"""
     conn = get_connection()
     query = "SELECT * FROM disclosures WHERE 1=1"
     params = []
@@ -471,6 +508,9 @@ def get_disclosures(source: str = None, target_date: str = None) -> list[dict]:
     if target_date:
         query += " AND disclosed_at LIKE ?"
         params.append(f"{target_date}%")
+    if max_market_cap is not None:
+        query += " AND (market_cap IS NULL OR market_cap <= ?)"
+        params.append(max_market_cap)
     query += " ORDER BY disclosed_at DESC, id DESC"
     rows = conn.execute(query, params).fetchall()
     conn.close()
@@ -489,9 +529,17 @@ def get_unnotified_disclosures() -> list[dict]:
 
 def mark_disclosure_notified(disclosure_id: int):
     """適時開示を通知済みにする"""
+    mark_disclosures_notified([disclosure_id])
+
+
+def mark_disclosures_notified(disclosure_ids: list[int]):
+    """複数の適時開示をまとめて通知済みにする（UPDATE 1文）"""
+    if not disclosure_ids:
+        return
+    placeholders = ",".join("?" * len(disclosure_ids))
     conn = get_connection()
-    conn.execute("UPDATE disclosures SET notified = 1 WHERE id = ?", (disclosure_id,))
-    conn.commit()
+    with conn:
+        conn.execute(f"UPDATE disclosures SET notified = 1 WHERE id IN ({placeholders})", list(disclosure_ids))
     conn.close()
 
 
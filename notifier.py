@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 import json
+import re
 
 import requests
 from analytics import load_config
 
 LINE_PUSH_URL = "https://api.line.me/v2/bot/message/push"
 
+# 節目文字列（"1200, 1150" など）から価格を取り出す
+_FUSHI_RE = re.compile(r"\d+(?:\.\d+)?")
+
 
 def _get_line_config() -> dict:
     config = load_config()
@@ -168,16 +172,16 @@ def build_morning_strategy(stocks: list[dict] = None) -> str:
         lot_text = "-"
         if fushi:
             try:
-                fushi_prices = [float(f.strip()) for f in fushi.split(",") if f.strip()]
+                fushi_prices = [float(f) for f in _FUSHI_RE.findall(fushi)]
                 if len(fushi_prices) >= 2:
                     entry = fushi_prices[0]
                     stop = fushi_prices[1]
-                    result = calc_lot_r(entry, stop, max_r)
+                    result = calc_lot_r(entry, stop, max_r, r_unit)
                     lot_text = f"{result['lot']}株"
                 elif len(fushi_prices) == 1:
                     entry = fushi_prices[0]
                     stop = entry * 0.95
-                    result = calc_lot_r(entry, stop, max_r)
+                    result = calc_lot_r(entry, stop, max_r, r_unit)
                     lot_text = f"{result['lot']}株(概算)"
             except (ValueError, ZeroDivisionError):
                 pass
@@ -5,7 +5,9 @@
 from __future__ import annotations
 
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import requests
@@ -21,12 +23,35 @@ HEADERS = {
 _market_cap_cache: dict[str, float | None] = {}
 _taishaku_cache: dict[str, bool] = {}
 
+# ランキング行の証券コード抽出（事前コンパイル）
+_NON_DIGIT_RE = re.compile(r"\D")
+_TICKER_RE = re.compile(r"\d{4}")
+
+# 時価総額・貸借チェックの同時リクエスト数（kabutan に負荷をかけすぎない程度）
+_LOOKUP_WORKERS = 4
+
+# kabutan へのリクエスト間隔（秒）。並列時も全スレッド合計でこの間隔を守る
+_REQUEST_INTERVAL = 0.5
+_request_lock = threading.Lock()
+_last_request = 0.0
+
+
+def _throttle() -> None:
+    """前回の kabutan リクエストから _REQUEST_INTERVAL 秒空くまで待つ（スレッド間で共有）"""
+    global _last_request
+    with _request_lock:
+        wait = _last_request + _REQUEST_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_request = time.monotonic()
+
 
 def _get_market_cap_cached(ticker: str) -> float | None:
     if ticker in _market_cap_cache:
         return _market_cap_cache[ticker]
     try:
         from data_fetch import fetch_kabutan_basic
+        _throttle()
         info = fetch_kabutan_basic(ticker)
         cap = info["market_cap"] if info and info.get("market_cap") else None
     except Exception:
@@ -41,12 +66,12 @@ def _is_taishaku_cached(ticker: str) -> bool:
         return _taishaku_cache[ticker]
     url = f"https://kabutan.jp/stock/?code={ticker}"
     try:
+        _throttle()
         resp = requests.get(url, headers=HEADERS, timeout=10)
         resp.encoding = "utf-8"
         # 銘柄ページ内に「貸借」という文字列があれば貸借銘柄
         result = "貸借" in resp.text
         _taishaku_cache[ticker] = result
-        time.sleep(0.5)
         return result
     except Exception:
         _taishaku_cache[ticker] = False
@@ -95,8 +120,8 @@ def fetch_kabutan_rising_stocks(
 
             # --- 証券コード（td[0]） ---
             code_text = tds[0].get_text(strip=True)
-            ticker = re.sub(r"\D", "", code_text)
-            if not re.match(r"^\d{4}$", ticker):
+            ticker = _NON_DIGIT_RE.sub("", code_text)
+            if not _TICKER_RE.fullmatch(ticker):
                 continue
 
             # --- 銘柄名（<th scope="row"> に入っている） ---
@@ -146,15 +171,27 @@ def fetch_kabutan_rising_stocks(
         print(f"[Ranking] 一次候補: {len(candidates)}件（pct>={pct_min}%, vol>={vol_min // 10000}万株）")
 
         # --- 時価総額・貸借チェック（キャッシュ活用） ---
-        results = []
-        for c in candidates:
-            cap = _get_market_cap_cached(c["ticker"])
+        def _check(ticker: str) -> tuple[bool, float | None]:
+            cap = _get_market_cap_cached(ticker)
             if cap is not None and cap > cap_max:
-                continue
-            if taishaku_only and not _is_taishaku_cached(c["ticker"]):
-                continue
-            c["market_cap"] = cap
-            results.append(c)
+                return False, cap
+            if taishaku_only and not _is_taishaku_cached(ticker):
+                return False, cap
+            return True, cap
+
+        # 銘柄ごとの問い合わせは直列だと件数分待つため、スレッドで並列に行う。
+        # リクエスト間隔は _throttle で全スレッド共通に保ち、同じコードは1回だけ問い合わせる
+        # （スレッドごとに別のキーを書くので、キャッシュの確認と書き込みが競合しない）
+        results = []
+        if candidates:
+            tickers = list(dict.fromkeys(c["ticker"] for c in candidates))
+            with ThreadPoolExecutor(max_workers=min(_LOOKUP_WORKERS, len(tickers))) as ex:
+                checks = dict(zip(tickers, ex.map(_check, tickers)))
+            for c in candidates:
+                ok, cap = checks[c["ticker"]]
+                if ok:
+                    c["market_cap"] = cap
+                    results.append(c)
 
         print(f"[Ranking] 最終HIT: {len(results)}件（時価総額{cap_max / 100_000_000:.0f}億以下 / 貸借銘柄）")
         return results
@@ -16,6 +16,7 @@ yfinance + 株探スクレイピングで株価データを取得・監視する
 
 from __future__ import annotations
 
+import re
 import time
 from collections import deque
 from datetime import datetime
@@ -322,6 +323,10 @@ def check_surge_alerts(prices: list[dict]) -> list[dict]:
 
 # ========== 節目アラート ==========
 
+# 節目文字列（"1500, 1450" など）から価格を取り出す
+_FUSHI_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
 def check_fushi_alerts(prices: list[dict]):
     """節目付近の銘柄をLINE通知する。"""
     for p in prices:
@@ -330,22 +335,16 @@ def check_fushi_alerts(prices: list[dict]):
         if not price:
             continue
 
-        stocks = db.get_stocks_by_ticker(ticker)
-        if not stocks:
+        latest = db.get_latest_stock_by_ticker(ticker)
+        if not latest:
             continue
 
-        latest = stocks[0]
         fushi_str = latest.get("fushi", "")
         if not fushi_str:
             continue
 
-        for fushi_val in fushi_str.split(","):
-            fushi_val = fushi_val.strip()
-            try:
-                fushi_price = float(fushi_val)
-            except ValueError:
-                continue
-
+        for fushi_val in _FUSHI_RE.findall(fushi_str):
+            fushi_price = float(fushi_val)
             if price >= fushi_price * 0.995 and price <= fushi_price * 1.005:
                 notify_price_alert(
                     name=latest["name"],
@@ -78,8 +78,7 @@ def job_check_tdnet():
     # TDnet 適時開示取得
     try:
         tdnet_items = fetch_tdnet_disclosures()
-        for item in tdnet_items:
-            disc_id = db.add_disclosure(item)
+        for item, disc_id in zip(tdnet_items, db.add_disclosures(tdnet_items)):
             if disc_id is not None:
                 item["id"] = disc_id
                 new_items.append(item)
@@ -92,9 +91,7 @@ def job_check_tdnet():
         notify_disclosures(new_items, source="TDnet")
 
         # 通知済みマーク
-        for item in new_items:
-            if item.get("id"):
-                db.mark_disclosure_notified(item["id"])
+        db.mark_disclosures_notified([item["id"] for item in new_items if item.get("id")])
 
     print(f"[Scheduler] TDnet開示チェック完了: 新規{len(new_items)}件")
 
@@ -16,6 +16,11 @@ HEADERS = {
 
 _market_cap_cache: dict[str, float | None] = {}
 
+# 開示一覧の行ごとに使う正規表現（事前コンパイル）
+_TIME_RE = re.compile(r"\d{2}:\d{2}")
+_NON_DIGIT_RE = re.compile(r"\D")
+_TICKER_RE = re.compile(r"\d{4,5}")
+
 
 def _get_market_cap_cached(ticker: str) -> float | None:
     if ticker in _market_cap_cache:
@@ -75,13 +80,13 @@ def fetch_tdnet_disclosures(target_date: str | None = None) -> list[dict]:
                 continue
 
             time_text = tds[0].get_text(strip=True)
-            if not re.match(r"\d{2}:\d{2}", time_text):
+            if not _TIME_RE.match(time_text):
                 continue
 
             code_text = tds[1].get_text(strip=True)
-            ticker = re.sub(r"\D", "", code_text)
+            ticker = _NON_DIGIT_RE.sub("", code_text)
             # 4桁または5桁コードを受け付ける（5桁は社債・ワラント等の場合もある）
-            if not re.match(r"^\d{4,5}$", ticker):
+            if not _TICKER_RE.fullmatch(ticker):
                 continue
 
             company_name = tds[2].get_text(strip=True) if len(tds) > 2 else ""
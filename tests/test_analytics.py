@@ -0,0 +1,182 @@
+"""カテゴリ別集計（エントリー分類・銘柄質）が従来のスカラー計算と一致することの確認"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analytics import (  # noqa: E402
+    STOP_REASON_MAP,
+    calc_entry_type_stats,
+    calc_expected_value,
+    calc_quality_stats,
+    calc_stop_reason_stats,
+    calc_trade_statistics,
+    index_map,
+    load_config,
+)
+
+
+def _reference_category_stats(trades: list[dict], key_field: str, categories: list[str]) -> list[dict]:
+    """ベクトル化前の1件ずつ回す計算（比較用）"""
+    results = []
+    for c in categories:
+        wins = [t.get("pnl", 0) or 0 for t in trades if t.get(key_field, "") == c and t.get("result") == "win"]
+        losses = [abs(t.get("pnl", 0) or 0) for t in trades if t.get(key_field, "") == c and t.get("result") != "win"]
+        total = len(wins) + len(losses)
+        if total == 0:
+            results.append({
+                "total": 0, "wins": 0, "losses": 0,
+                "win_rate": 0, "total_pnl": 0, "avg_pnl": 0,
+                "avg_win": 0, "avg_loss": 0,
+                "expected_value": 0, "profit_factor": 0,
+            })
+            continue
+        win_rate = len(wins) / total
+        avg_win = sum(wins) / len(wins) if wins else 0
+        avg_loss = sum(losses) / len(losses) if losses else 0
+        total_pnl = sum(wins) - sum(losses)
+        ev = calc_expected_value(win_rate, avg_win, avg_loss)
+        results.append({
+            "total": total,
+            "wins": len(wins),
+            "losses": len(losses),
+            "win_rate": round(win_rate, 4),
+            "total_pnl": round(total_pnl, 0),
+            "avg_pnl": round(total_pnl / total, 0),
+            "avg_win": round(avg_win, 0),
+            "avg_loss": round(avg_loss, 0),
+            "expected_value": ev["expected_value"],
+            "profit_factor": ev["profit_factor"],
+        })
+    return results
+
+
+# カテゴリごとの (結果, 損益)。半端値で np.round と round() の結果が分かれる組を含む
+_FIXED_GROUPS = [
+    [("win", 59), ("lose", 2360)],
+    [("win", -51), ("lose", -26200), ("win", 190)],
+    [("lose", -1200), ("win", -18)],
+    [("win", 12345), ("lose", -6789), ("win", 0), ("lose", None), ("win", 33333.5)],
+]
+
+
+def _fixed_trades(key_field: str, categories: list[str]) -> list[dict]:
+    trades = []
+    for c, group in zip(categories, _FIXED_GROUPS):
+        for result, pnl in group:
+            trades.append({"id": len(trades) + 1, "result": result, "pnl": pnl, key_field: c})
+    return trades
+
+
+def _stat_fields(stats: list) -> list[dict]:
+    rows = []
+    for s in stats:
+        d = s.to_dict()
+        d.pop("entry_type", None)
+        d.pop("quality", None)
+        rows.append(d)
+    return rows
+
+
+def test_entry_type_stats_match_scalar_reference():
+    entry_types = load_config().get("entry_types", [])
+    trades = _fixed_trades("entry_type", entry_types)
+    expected = _reference_category_stats(trades, "entry_type", entry_types)
+    assert _stat_fields(calc_entry_type_stats(trades)) == expected
+
+
+def test_quality_stats_match_scalar_reference():
+    qualities = load_config().get("meigara_quality_options", [])
+    trades = _fixed_trades("meigara_quality", qualities)
+    expected = _reference_category_stats(trades, "meigara_quality", qualities)
+    assert _stat_fields(calc_quality_stats(trades)) == expected
+
+
+def test_index_map_keeps_first_position_for_duplicates():
+    assert index_map(["a", "b", "a", "c"]) == {"a": 0, "b": 1, "c": 3}
+
+
+def _reference_stop_reason_stats(trades: list[dict]) -> list[dict]:
+    """ベクトル化前の出口戦略集計（比較用）"""
+    loss_trades = [t for t in trades if t.get("result") != "win"]
+    total_losses = len(loss_trades)
+    results = []
+    for col, label in STOP_REASON_MAP.items():
+        count = sum(1 for t in loss_trades if t.get(col))
+        results.append({
+            "reason": label,
+            "count": count,
+            "ratio": round(count / total_losses, 4) if total_losses > 0 else 0,
+        })
+    return results
+
+
+def test_stop_reason_stats_match_scalar_reference():
+    # 160件中1件 → 0.00625（np.round では 0.0062、round() では 0.0063）
+    trades = [{"id": i + 1, "result": "lose", "pnl": -1000} for i in range(160)]
+    trades[0]["stop_osaedama"] = 1
+    for t in trades[:3]:
+        t["stop_hamekomi"] = 1
+    trades[5]["stop_renkaiato"] = None
+    trades.append({"id": 161, "result": "win", "pnl": 5000, "stop_itakieru": 1})
+    expected = _reference_stop_reason_stats(trades)
+    assert [s.to_dict() for s in calc_stop_reason_stats(trades)] == expected
+    assert [s.to_dict() for s in calc_stop_reason_stats([])] == _reference_stop_reason_stats([])
+
+
+def _reference_trade_statistics(trades: list[dict]) -> dict:
+    """ベクトル化前の R ベース統計（比較用。ロット・精度は共通関数なので除く）"""
+    r_unit = load_config().get("risk", {}).get("r_unit", 10000)
+    win_trades = [t for t in trades if t.get("result") == "win"]
+    loss_trades = [t for t in trades if t.get("result") != "win"]
+    total = len(trades)
+    win_rate = len(win_trades) / total
+    loss_rate = 1 - win_rate
+    win_pnls_r = [abs(t.get("pnl", 0) or 0) / r_unit for t in win_trades]
+    loss_pnls_r = [abs(t.get("pnl", 0) or 0) / r_unit for t in loss_trades]
+    avg_win_r = sum(win_pnls_r) / len(win_pnls_r) if win_pnls_r else 0
+    avg_loss_r = sum(loss_pnls_r) / len(loss_pnls_r) if loss_pnls_r else 0
+    total_loss_r = sum(loss_pnls_r)
+    profit_factor = sum(win_pnls_r) / total_loss_r if total_loss_r > 0 else float("inf")
+    breakeven = avg_loss_r / (avg_win_r + avg_loss_r) if (avg_win_r + avg_loss_r) > 0 else 0
+    total_pnl = sum(t.get("pnl", 0) or 0 for t in trades)
+
+    max_w = max_l = cur_w = cur_l = 0
+    for t in sorted(trades, key=lambda x: x.get("date", "")):
+        if t.get("result") == "win":
+            cur_w, cur_l = cur_w + 1, 0
+            max_w = max(max_w, cur_w)
+        else:
+            cur_w, cur_l = 0, cur_l + 1
+            max_l = max(max_l, cur_l)
+
+    return {
+        "total": total,
+        "wins": len(win_trades),
+        "losses": len(loss_trades),
+        "win_rate": round(win_rate, 4),
+        "loss_rate": round(loss_rate, 4),
+        "total_pnl": round(total_pnl, 0),
+        "total_pnl_r": round(total_pnl / r_unit, 2),
+        "avg_win_r": round(avg_win_r, 2),
+        "avg_loss_r": round(avg_loss_r, 2),
+        "max_win_r": round(max(win_pnls_r) if win_pnls_r else 0, 2),
+        "max_loss_r": round(max(loss_pnls_r) if loss_pnls_r else 0, 2),
+        "expected_value_r": round(win_rate * avg_win_r - loss_rate * avg_loss_r, 2),
+        "profit_factor": round(profit_factor, 2),
+        "breakeven_winrate": round(breakeven, 4),
+        "consecutive_wins": max_w,
+        "consecutive_losses": max_l,
+    }
+
+
+def test_trade_statistics_match_scalar_reference():
+    trades = []
+    for i, group in enumerate(_FIXED_GROUPS):
+        for j, (result, pnl) in enumerate(group):
+            trades.append({"id": len(trades) + 1, "date": f"2024-0{i + 1}-{10 - j:02d}", "result": result, "pnl": pnl})
+    trades.append({"id": len(trades) + 1, "result": "lose", "pnl": -4321})  # 日付なし
+    expected = _reference_trade_statistics(trades)
+    stats = calc_trade_statistics(trades).to_dict()
+    assert {k: stats[k] for k in expected} == expected